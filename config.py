@@ -136,6 +136,7 @@ class Settings(BaseSettings):
     emby_api_key: str = Field(default="", alias="EMBY_API_KEY", description="Emby API密钥")
     strm_root_path: str = Field(default="", alias="STRM_ROOT_PATH", description="STRM文件根路径")
     emby_root_path: str = Field(default="", alias="EMBY_ROOT_PATH", description="Emby媒体库根路径")
+    emby_refresh_concurrency: int = Field(default=4, alias="EMBY_REFRESH_CONCURRENCY", description="同时进行的Emby刷新请求数")
     
     # 下载元数据文件配置
     download_metadata: bool = Field(default=False, alias="DOWNLOAD_METADATA")
@@ -132,25 +132,24 @@ async def perform_health_scan(scan_type: str, scan_mode: str):
         _scan_progress = 0
         all_problems = []
         
-        # 根据扫描类型和模式选择执行的检测
-        if scan_type in ["strm_validity", "all"]:
-            _scan_status = "正在检查STRM文件有效性..."
-            invalid_strm_files = await check_strm_validity(scan_mode)
-            all_problems.extend(invalid_strm_files)
-            _scan_progress = 50 if scan_type == "all" else 100
+        # 整个扫描期间批量修改健康数据，结束时统一保存一次
+        with service_manager.health_service.batch():
+            # 根据扫描类型和模式选择执行的检测
+            if scan_type in ["strm_validity", "all"]:
+                _scan_status = "正在检查STRM文件有效性..."
+                invalid_strm_files = await check_strm_validity(scan_mode)
+                all_problems.extend(invalid_strm_files)
+                _scan_progress = 50 if scan_type == "all" else 100
             
-        if scan_type in ["video_coverage", "all"]:
-            _scan_status = "正在检查视频文件覆盖情况..."
-            missing_strm_files = await check_video_coverage(scan_mode)
-            all_problems.extend(missing_strm_files)
-            _scan_progress = 100
-        
-        # 更新最后扫描时间（只有完整扫描才更新）
-        if scan_mode == "full":
-            service_manager.health_service.update_last_full_scan_time()
-            
-        # 保存健康状态数据
-        service_manager.health_service.save_health_data()
+            if scan_type in ["video_coverage", "all"]:
+                _scan_status = "正在检查视频文件覆盖情况..."
+                missing_strm_files = await check_video_coverage(scan_mode)
+                all_problems.extend(missing_strm_files)
+                _scan_progress = 100
+        
+            # 更新最后扫描时间（只有完整扫描才更新）
+            if scan_mode == "full":
+                service_manager.health_service.update_last_full_scan_time()
         
         # 转换问题列表为返回格式
         problems = [
@@ -234,9 +233,6 @@ async def check_strm_validity(scan_mode: str):
                     "status": "invalid",
                     "issueDetails": reason
                 })
-                
-        # 保存健康状态数据
-        service_manager.health_service.save_health_data()
     else:
         # 扫描所有STRM文件或增量扫描
         # 扫描所有STRM文件
@@ -299,9 +295,6 @@ async def check_strm_validity(scan_mode: str):
                     "targetPath": target_path
                 })
         
-        # 保存健康状态数据
-        service_manager.health_service.save_health_data()
-        
         logger.info(f"完成STRM文件有效性检查，发现 {len(invalid_strm_files)} 个无效文件")
     
     return invalid_strm_files
@@ -336,6 +329,8 @@ async def check_video_coverage(scan_mode: str):
                 # 视频文件已不存在，从数据中移除
                 if "videoFiles" in service_manager.health_service._health_data and video_path in service_manager.health_service._health_data["videoFiles"]:
                     del service_manager.health_service._health_data["videoFiles"][video_path]
+                    # 直接删除不经过更新方法，需手动标记待保存
+                    service_manager.health_service._mark_dirty()
                 continue
             
             # 检查是否有了对应的STRM文件
@@ -793,21 +788,20 @@ async def repair_invalid_strm(request: RepairRequest):
         logger.info(f"尝试清理 {len(request.paths)} 个无效的STRM文件")
         
         success_count = 0
-        for path in request.paths:
-            try:
-                # 删除STRM文件
-                file_path = Path(path)
-                if file_path.exists() and file_path.is_file():
-                    file_path.unlink()
-                    success_count += 1
+        # 批量修改健康数据，结束时统一保存一次
+        with service_manager.health_service.batch():
+            for path in request.paths:
+                try:
+                    # 删除STRM文件
+                    file_path = Path(path)
+                    if file_path.exists() and file_path.is_file():
+                        file_path.unlink()
+                        success_count += 1
                     
-                    # 从健康状态数据中移除
-                    service_manager.health_service.remove_strm_file(str(file_path))
-            except Exception as e:
-                logger.error(f"删除文件失败: {path}, 错误: {str(e)}")
-        
-        # 保存健康状态数据
-        service_manager.health_service.save_health_data()
+                        # 从健康状态数据中移除
+                        service_manager.health_service.remove_strm_file(str(file_path))
+                except Exception as e:
+                    logger.error(f"删除文件失败: {path}, 错误: {str(e)}")
         
         return {"success": True, "message": f"已成功清理 {success_count} 个无效的STRM文件"}
     
@@ -830,54 +824,53 @@ async def repair_missing_strm(request: RepairRequest):
         
         # 调用strm_service处理这些文件
         success_count = 0
-        for video_path in request.paths:
-            try:
-                # 构建Alist URL
-                alist_url = service_manager.strm_service.settings.alist_url
+        # 批量修改健康数据，结束时统一保存一次
+        with service_manager.health_service.batch():
+            for video_path in request.paths:
+                try:
+                    # 构建Alist URL
+                    alist_url = service_manager.strm_service.settings.alist_url
                 
-                # 确保video_path不包含重复的文件名
-                # 先解码视频路径，确保处理的是原始路径
-                decoded_path = unquote(video_path)
-                filename = os.path.basename(decoded_path)
-                if os.path.basename(os.path.dirname(decoded_path)) == filename:
-                    # 路径结尾有重复的文件名，移除最后一个
-                    decoded_path = os.path.dirname(decoded_path)
+                    # 确保video_path不包含重复的文件名
+                    # 先解码视频路径，确保处理的是原始路径
+                    decoded_path = unquote(video_path)
+                    filename = os.path.basename(decoded_path)
+                    if os.path.basename(os.path.dirname(decoded_path)) == filename:
+                        # 路径结尾有重复的文件名，移除最后一个
+                        decoded_path = os.path.dirname(decoded_path)
                 
-                # 需要重新编码路径用于URL
-                encoded_path = quote(decoded_path)
-                video_url = f"{alist_url}/d/{encoded_path}"
+                    # 需要重新编码路径用于URL
+                    encoded_path = quote(decoded_path)
+                    video_url = f"{alist_url}/d/{encoded_path}"
                 
-                # 获取文件名和扩展名
-                filename = os.path.basename(decoded_path)
-                name, _ = os.path.splitext(filename)
+                    # 获取文件名和扩展名
+                    filename = os.path.basename(decoded_path)
+                    name, _ = os.path.splitext(filename)
                 
-                # 计算输出路径 - 需要保持目录结构
-                output_dir = service_manager.strm_service.settings.output_dir
-                rel_path = os.path.dirname(decoded_path)
+                    # 计算输出路径 - 需要保持目录结构
+                    output_dir = service_manager.strm_service.settings.output_dir
+                    rel_path = os.path.dirname(decoded_path)
                 
-                # 创建输出目录
-                full_output_dir = os.path.join(output_dir, rel_path.lstrip('/'))
-                os.makedirs(full_output_dir, exist_ok=True)
+                    # 创建输出目录
+                    full_output_dir = os.path.join(output_dir, rel_path.lstrip('/'))
+                    os.makedirs(full_output_dir, exist_ok=True)
                 
-                # 生成STRM文件
-                strm_path = os.path.join(full_output_dir, f"{name}@remote(网盘).strm")
+                    # 生成STRM文件
+                    strm_path = os.path.join(full_output_dir, f"{name}@remote(网盘).strm")
                 
-                # 日志记录，便于调试
-                logger.info(f"生成STRM文件: {strm_path} -> {video_url}")
+                    # 日志记录，便于调试
+                    logger.info(f"生成STRM文件: {strm_path} -> {video_url}")
                 
-                with open(strm_path, 'w', encoding='utf-8') as f:
-                    f.write(video_url)
+                    with open(strm_path, 'w', encoding='utf-8') as f:
+                        f.write(video_url)
                     
-                success_count += 1
+                    success_count += 1
                 
-                # 更新健康状态数据
-                service_manager.health_service.add_strm_file(strm_path, decoded_path)
+                    # 更新健康状态数据
+                    service_manager.health_service.add_strm_file(strm_path, decoded_path)
                 
-            except Exception as e:
-                logger.error(f"为视频生成STRM文件失败: {video_path}, 错误: {str(e)}")
-        
-        # 保存健康状态数据
-        service_manager.health_service.save_health_data()
+                except Exception as e:
+                    logger.error(f"为视频生成STRM文件失败: {video_path}, 错误: {str(e)}")
         
         return {"success": True, "message": f"已成功为 {success_count} 个视频生成STRM文件"}
     
@@ -911,26 +904,25 @@ async def delete_strm_files(paths: List[str] = Body(..., description="要删除
     deleted_files = []
     failed_files = []
     
-    for path in paths:
-        try:
-            # 确保路径存在且是一个文件
-            if os.path.isfile(path):
-                # 从健康状态数据中移除记录
-                service_manager.health_service.remove_strm_file(path)
+    # 批量修改健康数据，结束时统一保存一次
+    with service_manager.health_service.batch():
+        for path in paths:
+            try:
+                # 确保路径存在且是一个文件
+                if os.path.isfile(path):
+                    # 从健康状态数据中移除记录
+                    service_manager.health_service.remove_strm_file(path)
                 
-                # 物理删除文件
-                os.remove(path)
-                deleted_files.append(path)
-                logger.info(f"成功删除STRM文件: {path}")
-            else:
-                failed_files.append({"path": path, "reason": "文件不存在或不是一个有效的文件"})
-                logger.warning(f"删除STRM文件失败: {path} - 文件不存在或不是一个有效的文件")
-        except Exception as e:
-            failed_files.append({"path": path, "reason": str(e)})
-            logger.error(f"删除STRM文件时出错: {path} - {str(e)}")
-    
-    # 保存健康状态数据
-    service_manager.health_service.save_health_data()
+                    # 物理删除文件
+                    os.remove(path)
+                    deleted_files.append(path)
+                    logger.info(f"成功删除STRM文件: {path}")
+                else:
+                    failed_files.append({"path": path, "reason": "文件不存在或不是一个有效的文件"})
+                    logger.warning(f"删除STRM文件失败: {path} - 文件不存在或不是一个有效的文件")
+            except Exception as e:
+                failed_files.append({"path": path, "reason": str(e)})
+                logger.error(f"删除STRM文件时出错: {path} - {str(e)}")
     
     return {
         "status": "success" if not failed_files else "partial_success",
@@ -965,49 +957,48 @@ async def batch_replace_strm_content(request: ReplaceRequest):
         # 预览模式下收集的替换预览
         preview_results = []
         
-        for strm_file in strm_files:
-            try:
-                # 读取STRM文件内容
-                with open(strm_file, 'r', encoding='utf-8') as f:
-                    content = f.read()
+        # 批量修改健康数据，结束时统一保存一次
+        with service_manager.health_service.batch():
+            for strm_file in strm_files:
+                try:
+                    # 读取STRM文件内容
+                    with open(strm_file, 'r', encoding='utf-8') as f:
+                        content = f.read()
                 
-                # 检查是否需要替换
-                if request.search_text in content:
-                    new_content = content.replace(request.search_text, request.replace_text)
+                    # 检查是否需要替换
+                    if request.search_text in content:
+                        new_content = content.replace(request.search_text, request.replace_text)
                     
-                    # 预览模式下只收集信息，不实际修改
-                    if request.preview_only:
-                        preview_results.append({
-                            "path": str(strm_file),
-                            "original": content,
-                            "new": new_content
-                        })
-                    else:
-                        # 写入新内容
-                        with open(strm_file, 'w', encoding='utf-8') as f:
-                            f.write(new_content)
+                        # 预览模式下只收集信息，不实际修改
+                        if request.preview_only:
+                            preview_results.append({
+                                "path": str(strm_file),
+                                "original": content,
+                                "new": new_content
+                            })
+                        else:
+                            # 写入新内容
+                            with open(strm_file, 'w', encoding='utf-8') as f:
+                                f.write(new_content)
                         
-                        # 添加到已替换列表
-                        replaced_files.append(str(strm_file))
+                            # 添加到已替换列表
+                            replaced_files.append(str(strm_file))
                         
-                        # 更新健康状态数据
-                        target_path = await extract_target_path_from_file(strm_file)
-                        service_manager.health_service.update_strm_status(str(strm_file), {
-                            "status": "valid",  # 假设替换后文件有效
-                            "targetPath": target_path
-                        })
+                            # 更新健康状态数据
+                            target_path = await extract_target_path_from_file(strm_file)
+                            service_manager.health_service.update_strm_status(str(strm_file), {
+                                "status": "valid",  # 假设替换后文件有效
+                                "targetPath": target_path
+                            })
                         
-                        logger.info(f"成功替换STRM文件内容: {strm_file}")
-                else:
-                    unchanged_files.append(str(strm_file))
-            except Exception as e:
-                failed_files.append({"path": str(strm_file), "reason": str(e)})
-                logger.error(f"替换STRM文件内容失败: {strm_file}, 错误: {str(e)}")
+                            logger.info(f"成功替换STRM文件内容: {strm_file}")
+                    else:
+                        unchanged_files.append(str(strm_file))
+                except Exception as e:
+                    failed_files.append({"path": str(strm_file), "reason": str(e)})
+                    logger.error(f"替换STRM文件内容失败: {strm_file}, 错误: {str(e)}")
         
-        # 如果不是预览模式，保存健康状态数据
         if not request.preview_only:
-            service_manager.health_service.save_health_data()
-            
             return {
                 "status": "success",
                 "total": total_files,
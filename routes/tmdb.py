@@ -20,7 +20,9 @@ async def get_tmdb_stats():
 @router.get("/items")
 async def get_tmdb_items(
     type: str = Query(..., description="元数据类型: tmdb-tv, tmdb-movies2, tmdb-collections"),
-    search: str = Query("", description="搜索关键词")
+    search: str = Query("", description="搜索关键词"),
+    limit: Optional[int] = Query(None, ge=0, description="最多返回的数量，不传则返回全部"),
+    offset: int = Query(0, ge=0, description="跳过的数量")
 ):
     """获取TMDB元数据项目列表"""
     try:
@@ -29,7 +31,7 @@ async def get_tmdb_items(
             return {"success": False, "message": "无效的元数据类型"}
         
         # 搜索项目
-        results = service_manager.strm_assistant_service.search_items(search)
+        results = service_manager.strm_assistant_service.search_items(search, limit=limit, offset=offset)
         
         # 返回指定类型的结果
         return {"success": True, "data": results.get(type, [])}
@@ -49,7 +51,7 @@ async def get_tmdb_detail(
             return {"success": False, "message": "无效的元数据类型"}
         
         # 获取详情
-        detail = service_manager.strm_assistant_service.get_item_metadata(type, id)
+        detail = await service_manager.strm_assistant_service.get_item_metadata_async(type, id)
         
         if not detail:
             return {"success": False, "message": "未找到元数据"}
@@ -64,7 +66,7 @@ async def get_tmdb_seasons(id: str = Query(..., description="剧集TMDB ID")):
     """获取剧集的季节列表"""
     try:
         # 获取季节列表
-        seasons = service_manager.strm_assistant_service.get_seasons("tmdb-tv", id)
+        seasons = await service_manager.strm_assistant_service.get_seasons_async("tmdb-tv", id)
         return {"success": True, "data": seasons}
     except Exception as e:
         logger.error(f"获取季节列表失败: {str(e)}")
@@ -78,7 +80,7 @@ async def get_tmdb_episodes(
     """获取指定季的集列表"""
     try:
         # 获取集列表
-        episodes = service_manager.strm_assistant_service.get_episodes("tmdb-tv", id, season)
+        episodes = await service_manager.strm_assistant_service.get_episodes_async("tmdb-tv", id, season)
         return {"success": True, "data": episodes}
     except Exception as e:
         logger.error(f"获取集列表失败: {str(e)}")
@@ -96,7 +98,7 @@ async def delete_tmdb_item(
             return {"success": False, "message": "无效的元数据类型"}
         
         # 删除项目
-        success = service_manager.strm_assistant_service.delete_item(type, id)
+        success = await service_manager.strm_assistant_service.delete_item_async(type, id)
         
         if not success:
             return {"success": False, "message": "删除失败"}
@@ -111,7 +113,7 @@ async def reload_tmdb_metadata():
     """重新加载所有TMDB元数据"""
     try:
         # 重新加载元数据
-        stats = service_manager.strm_assistant_service.load_all_metadata()
+        stats = await service_manager.strm_assistant_service.load_all_metadata_async()
         return {"success": True, "data": stats, "message": "元数据已重新加载"}
     except Exception as e:
         logger.error(f"重新加载TMDB元数据失败: {str(e)}")
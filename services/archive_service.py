@@ -11,6 +11,7 @@ import asyncio
 import importlib
 import json
 from services.alist_client import AlistClient
+from services.strm_service import _compile_skip_patterns
 import re
 from urllib.parse import quote
 
@@ -332,7 +333,7 @@ class ArchiveService:
                     # 发送通知
                     service_manager = self._get_service_manager()
                     notification_msg = f"📝 从待删除列表移除不存在的文件:\n{item['path']}"
-                    await service_manager.telegram_service.send_message(notification_msg)
+                    service_manager.telegram_service.enqueue_message(notification_msg)
                 
                 # 执行删除操作
                 successful_deletions = []  # 记录成功删除的项目，方便后续从队列移除
@@ -347,7 +348,7 @@ class ArchiveService:
                             # 发送删除通知
                             service_manager = self._get_service_manager()
                             notification_msg = f"🗑️ 已删除延迟文件:\n{path}"
-                            await service_manager.telegram_service.send_message(notification_msg)
+                            service_manager.telegram_service.enqueue_message(notification_msg)
                         else:
                             logger.warning(f"删除文件失败，将保留在队列中稍后重试: {path}")
                     except Exception as e:
@@ -408,7 +409,7 @@ class ArchiveService:
                 service_manager = self._get_service_manager()
                 delete_time_str = datetime.fromtimestamp(delete_time).strftime("%Y-%m-%d %H:%M:%S")
                 notification_msg = f"📝 文件已加入待删除列表:\n{path}\n计划删除时间: {delete_time_str}"
-                asyncio.create_task(service_manager.telegram_service.send_message(notification_msg))
+                service_manager.telegram_service.enqueue_message(notification_msg)
             except Exception as e:
                 logger.error(f"发送通知失败: {e}")
             
@@ -474,7 +475,7 @@ class ArchiveService:
             return True
         
         # 检查用户配置的模式
-        if any(re.search(pattern, str(path)) for pattern in self.settings.skip_patterns_list):
+        if any(pattern.search(str(path)) for pattern in _compile_skip_patterns(tuple(self.settings.skip_patterns_list))):
             logger.debug(f"跳过匹配模式的目录: {path}")
             return True
         
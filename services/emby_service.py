@@ -1,16 +1,18 @@
 import os
 import json
-import re
 import time
+import random
 import asyncio
 import httpx
+import orjson
 import logging
 from datetime import datetime
+from functools import lru_cache
 from pathlib import Path
 from typing import Dict, List, Optional, Any
 from config import Settings
 import importlib
-from urllib.parse import quote
+import importlib.util
 
 # 设置日志
 logger = logging.getLogger(__name__)
@@ -18,11 +20,29 @@ logger = logging.getLogger(__name__)
 class EmbyService:
     """Emby服务，用于与Emby API通信和刷新元数据"""
     
+    # 安装了h2时启用HTTP/2
+    HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+    
+    # 刷新请求遇到5xx或连接错误时的快速重试次数
+    REFRESH_ATTEMPTS = 3
+    
+    # 刷新请求的固定参数，与api_key合并后缓存在实例上
+    _REFRESH_PARAMS = {
+        "Recursive": "true",
+        "MetadataRefreshMode": "FullRefresh",
+        "ImageRefreshMode": "FullRefresh"
+    }
+    
     def __init__(self):
         """初始化Emby服务"""
-        self.settings = Settings()
         self.refresh_settings()
         
+        # 共享的HTTP客户端，首次请求时创建，复用连接池
+        self._client: Optional[httpx.AsyncClient] = None
+        
+        # service_manager引用，延迟到首次使用时解析
+        self._service_manager = None
+        
         # 创建缓存目录
         cache_dir = "/app/cache"
         os.makedirs(cache_dir, exist_ok=True)
@@ -49,6 +69,8 @@ class EmbyService:
         self.strm_root_path = self.settings.strm_root_path
         self.emby_root_path = self.settings.emby_root_path
         self.emby_enabled = self.settings.emby_enabled
+        # 同时进行的刷新请求数上限
+        self.refresh_concurrency = max(1, int(self.settings.emby_refresh_concurrency or 1))
 
         logger.debug(
             f"Emby初始化 - emby_enabled: {self.emby_enabled}, "
@@ -59,31 +81,71 @@ class EmbyService:
             logger.warning("Emby配置不完整，服务将不可用")
             self.emby_enabled = False
 
+    @property
+    def emby_url(self) -> str:
+        return self._emby_url
+
+    @emby_url.setter
+    def emby_url(self, value: str):
+        self._emby_url = value
+        # URL只在配置变化时校验一次，请求时直接使用结果
+        self._base_url = (value or "").rstrip("/")
+        self._base_url_ok = self._base_url.startswith(("http://", "https://"))
+        self._items_url = f"{self._base_url}/Items"
+
+    @property
+    def api_key(self) -> str:
+        return self._api_key
+
+    @api_key.setter
+    def api_key(self, value: str):
+        self._api_key = value
+        # 刷新请求参数只随api_key变化，预先构建好整份参数
+        self._refresh_params = {"api_key": value, **self._REFRESH_PARAMS}
+
+    @property
+    def strm_root_path(self) -> str:
+        return self._strm_root_path
+
+    @strm_root_path.setter
+    def strm_root_path(self, value: str):
+        self._strm_root_path = value
+        # 根路径只在配置变化时归一化一次，避免每次路径转换重复处理
+        self._strm_root_norm = (value or "").replace("\\", "/").rstrip("/")
+
+    @property
+    def emby_root_path(self) -> str:
+        return self._emby_root_path
+
+    @emby_root_path.setter
+    def emby_root_path(self, value: str):
+        self._emby_root_path = value
+        self._emby_root_norm = (value or "").replace("\\", "/").rstrip("/")
+
     def convert_to_emby_path(self, strm_path: str) -> str:
         """将STRM路径映射到Emby媒体库路径。"""
         if not strm_path:
             return strm_path
+        return self._convert_path(strm_path, self._strm_root_norm, self._emby_root_norm)
 
+    @staticmethod
+    @lru_cache(maxsize=4096)
+    def _convert_path(strm_path: str, strm_root: str, emby_root: str) -> str:
+        """路径转换的纯函数实现，按(路径, 根路径)缓存结果"""
         normalized = strm_path.replace("\\", "/")
-        strm_root = (self.strm_root_path or "").replace("\\", "/").rstrip("/")
-        emby_root = (self.emby_root_path or "").replace("\\", "/").rstrip("/")
 
         if not strm_root or not emby_root:
             return normalized
 
-        if normalized == strm_root or normalized.startswith(f"{strm_root}/"):
-            suffix = normalized[len(strm_root):].lstrip("/")
-            target = f"{emby_root}/{suffix}" if suffix else emby_root
-            return os.path.normpath(target).replace("\\", "/")
-
+        # 忽略开头的斜杠比较，同时兼容绝对路径和相对路径写法
         stripped = normalized.lstrip("/")
         stripped_root = strm_root.lstrip("/")
-        if stripped_root and (stripped == stripped_root or stripped.startswith(f"{stripped_root}/")):
-            suffix = stripped[len(stripped_root):].lstrip("/")
-            target = f"{emby_root}/{suffix}" if suffix else emby_root
-            return os.path.normpath(target).replace("\\", "/")
+        if not stripped_root or not (stripped == stripped_root or stripped.startswith(f"{stripped_root}/")):
+            return normalized
 
-        return normalized
+        suffix = stripped[len(stripped_root):].lstrip("/")
+        target = f"{emby_root}/{suffix}" if suffix else emby_root
+        return os.path.normpath(target).replace("\\", "/")
     
     def add_to_refresh_queue(self, strm_path: str, media_info: dict = None):
         """兼容方法 - 不再使用刷新队列，但保留此方法以兼容现有调用
@@ -253,54 +315,71 @@ class EmbyService:
         except Exception as e:
             logger.error(f"保存最近扫描记录失败: {e}")
 
+    def _get_client(self) -> httpx.AsyncClient:
+        """获取共享的HTTP客户端，避免每次请求都重新建立连接"""
+        if self._client is None or self._client.is_closed:
+            # 连接阶段失败（连接被拒绝/重置）由传输层直接重试；
+            # 服务端支持HTTP/2时并发刷新通过多路复用共用一条连接
+            transport = httpx.AsyncHTTPTransport(
+                retries=2,
+                http2=self.HTTP2_AVAILABLE,
+                limits=httpx.Limits(max_keepalive_connections=20, max_connections=100)
+            )
+            self._client = httpx.AsyncClient(timeout=30, transport=transport)
+        return self._client
+
+    async def close(self):
+        """关闭HTTP客户端"""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
     def _get_service_manager(self):
-        """动态获取service_manager以避免循环依赖"""
-        module = importlib.import_module('services.service_manager')
-        return module.service_manager 
+        """动态获取service_manager以避免循环依赖，首次解析后缓存引用"""
+        if self._service_manager is None:
+            module = importlib.import_module('services.service_manager')
+            self._service_manager = module.service_manager
+        return self._service_manager
     
     async def refresh_emby_item(self, item_id: str) -> bool:
         """刷新Emby中的媒体项"""
         try:
             # 确保emby_url是合法的URL
-            if not self.emby_url or not self.emby_url.startswith(('http://', 'https://')):
+            if not self._base_url_ok:
                 logger.error(f"无效的Emby API URL: {self.emby_url}")
                 print(f"[Emby刷新] 错误: 无效的API URL: {self.emby_url}")
                 return False
             
-            # 构建API URL - 修复路径重复问题
-            base_url = self.emby_url
-            if base_url.endswith('/'):
-                base_url = base_url[:-1]  # 移除末尾的斜杠
-                
-            # 检查并调整API路径
-            url = f"{base_url}/Items/{item_id}/Refresh"
+            url = f"{self._items_url}/{item_id}/Refresh"
+            params = self._refresh_params
             
-            params = {
-                "api_key": self.api_key,
-                "Recursive": "true",
-                "MetadataRefreshMode": "FullRefresh",
-                "ImageRefreshMode": "FullRefresh"
-            }
-            
-            logger.info(f"正在刷新Emby项目: ID={item_id}, 请求URL={url}")
+            logger.debug("正在刷新Emby项目: ID=%s, 请求URL=%s", item_id, url)
             print(f"[Emby刷新] 发送刷新请求: ID={item_id}, URL={url}")
             
             # 发送请求
-            async with httpx.AsyncClient() as client:
-                start_time = time.time()
+            client = self._get_client()
+            start_time = time.time()
+            # 连接失败已由客户端transport重试，这里只重试服务端5xx错误
+            for attempt in range(self.REFRESH_ATTEMPTS):
                 response = await client.post(url, params=params, timeout=30)
-                duration = time.time() - start_time
-                
-                if response.status_code in (200, 204):
-                    logger.info(f"成功刷新Emby项目: ID={item_id}, 状态码: {response.status_code}, 耗时: {duration:.2f}秒")
-                    print(f"[Emby刷新] 成功: ID={item_id}, 状态码: {response.status_code}, 耗时: {duration:.2f}秒")
-                    return True
-                else:
-                    logger.error(f"刷新Emby项目失败: ID={item_id}, 状态码: {response.status_code}, 耗时: {duration:.2f}秒")
-                    logger.error(f"响应内容: {response.text[:500] if response.text else '无响应内容'}")
-                    print(f"[Emby刷新] 失败: ID={item_id}, 状态码: {response.status_code}, 耗时: {duration:.2f}秒")
-                    print(f"[Emby刷新] 响应内容: {response.text[:200] if response.text else '无响应内容'}")
-                    return False
+                if response.status_code < 500 or attempt == self.REFRESH_ATTEMPTS - 1:
+                    break
+                # 短暂退避后重试，加入随机抖动避免并发请求同时重试
+                delay = 0.5 * 2 ** attempt + random.random() * 0.1
+                logger.warning(f"刷新Emby项目暂时失败，{delay:.2f}秒后重试: ID={item_id}, 第{attempt + 1}次")
+                await asyncio.sleep(delay)
+            duration = time.time() - start_time
+            
+            if response.status_code in (200, 204):
+                logger.debug("成功刷新Emby项目: ID=%s, 状态码: %s, 耗时: %.2f秒", item_id, response.status_code, duration)
+                print(f"[Emby刷新] 成功: ID={item_id}, 状态码: {response.status_code}, 耗时: {duration:.2f}秒")
+                return True
+            else:
+                logger.error(f"刷新Emby项目失败: ID={item_id}, 状态码: {response.status_code}, 耗时: {duration:.2f}秒")
+                logger.error(f"响应内容: {response.text[:500] if response.text else '无响应内容'}")
+                print(f"[Emby刷新] 失败: ID={item_id}, 状态码: {response.status_code}, 耗时: {duration:.2f}秒")
+                print(f"[Emby刷新] 响应内容: {response.text[:200] if response.text else '无响应内容'}")
+                return False
             
             return False
         except Exception as e:
@@ -308,6 +387,23 @@ class EmbyService:
             print(f"[Emby刷新] 出错: ID={item_id}, 错误: {str(e)}")
             return False
 
+    async def _refresh_concurrently(self, item_ids: List[str]) -> List[Any]:
+        """并发刷新多个项目，用信号量限制同时进行的请求数
+        
+        Args:
+            item_ids: 要刷新的项目ID列表
+            
+        Returns:
+            List[Any]: 与item_ids一一对应的刷新结果，出错时为异常对象
+        """
+        semaphore = asyncio.Semaphore(self.refresh_concurrency)
+
+        async def _refresh_one(item_id: str) -> bool:
+            async with semaphore:
+                return await self.refresh_emby_item(item_id)
+
+        return await asyncio.gather(*(_refresh_one(item_id) for item_id in item_ids), return_exceptions=True)
+
     async def get_latest_items(self, limit: int = 30, item_types: str = "Series,Movie", recursive: bool = True) -> List[Dict]:
         """获取最新入库的媒体项
         
@@ -326,14 +422,17 @@ class EmbyService:
                 return []
             
             # 构建API URL
-            base_url = self.emby_url.rstrip('/')
+            base_url = self._base_url
             url = f"{base_url}/Items"
             
             # 构建查询参数
             params = {
                 "api_key": self.api_key,
                 "Limit": limit,
-                "Fields": "Path,DateCreated,ParentId,Overview,ProductionYear",
+                # 只请求扫描结果实际用到的字段，减少响应体积
+                "Fields": "Path,DateCreated,Overview,ProductionYear",
+                "EnableImages": "false",
+                "EnableUserData": "false",
                 "SortBy": "DateCreated",
                 "SortOrder": "Descending",
                 "Recursive": str(recursive).lower()
@@ -348,39 +447,39 @@ class EmbyService:
             print(f"[Emby] 参数: 类型={item_types}, 数量={limit}, 递归={recursive}, Fields={params['Fields']}")
             
             # 发送请求
-            async with httpx.AsyncClient() as client:
-                start_time = time.time()
-                print(f"[Emby] 正在发送请求...")
-                response = await client.get(url, params=params, timeout=30)
-                duration = time.time() - start_time
+            client = self._get_client()
+            start_time = time.time()
+            print(f"[Emby] 正在发送请求...")
+            response = await client.get(url, params=params, timeout=30)
+            duration = time.time() - start_time
+            
+            if response.status_code == 200:
+                data = orjson.loads(response.content)
+                items = data.get("Items", [])
+                total_items = data.get("TotalRecordCount", 0)
+                logger.info(f"成功获取最新项目: 返回{len(items)}个项目 (总计{total_items}个), 耗时: {duration:.2f}秒")
+                print(f"[Emby] 成功获取最新项目: 返回{len(items)}个项目 (总计{total_items}个), 耗时: {duration:.2f}秒")
+                
+                # 记录一些项目信息用于调试
+                if items:
+                    logger.debug("获取到的部分项目:")
+                    print("[Emby] 获取到的部分项目:")
+                    for i, item in enumerate(items[:5]):  # 只记录前5个项目
+                        path = item.get('Path', '未知')
+                        is_strm_path = '/media/Strm' in path if path else False
+                        logger.debug(f"  {i+1}. ID={item.get('Id')}, 名称={item.get('Name')}, 类型={item.get('Type')}, 路径={path}, STRM={is_strm_path}")
+                        print(f"[Emby]   {i+1}. ID={item.get('Id')}, 名称={item.get('Name')}, 类型={item.get('Type')}, STRM={is_strm_path}")
+                        if item.get('DateCreated'):
+                            print(f"[Emby]      创建时间: {item.get('DateCreated')}")
+                
+                return items
+            else:
+                logger.error(f"获取最新项目失败: 状态码={response.status_code}, 耗时: {duration:.2f}秒")
+                logger.error(f"响应内容: {response.text[:500] if response.text else '无响应内容'}")
+                print(f"[Emby] 错误: 获取最新项目失败, 状态码={response.status_code}")
+                print(f"[Emby] 响应内容: {response.text[:200] if response.text else '无响应内容'}")
+                return []
                 
-                if response.status_code == 200:
-                    data = response.json()
-                    items = data.get("Items", [])
-                    total_items = data.get("TotalRecordCount", 0)
-                    logger.info(f"成功获取最新项目: 返回{len(items)}个项目 (总计{total_items}个), 耗时: {duration:.2f}秒")
-                    print(f"[Emby] 成功获取最新项目: 返回{len(items)}个项目 (总计{total_items}个), 耗时: {duration:.2f}秒")
-                    
-                    # 记录一些项目信息用于调试
-                    if items:
-                        logger.debug("获取到的部分项目:")
-                        print("[Emby] 获取到的部分项目:")
-                        for i, item in enumerate(items[:5]):  # 只记录前5个项目
-                            path = item.get('Path', '未知')
-                            is_strm_path = '/media/Strm' in path if path else False
-                            logger.debug(f"  {i+1}. ID={item.get('Id')}, 名称={item.get('Name')}, 类型={item.get('Type')}, 路径={path}, STRM={is_strm_path}")
-                            print(f"[Emby]   {i+1}. ID={item.get('Id')}, 名称={item.get('Name')}, 类型={item.get('Type')}, STRM={is_strm_path}")
-                            if item.get('DateCreated'):
-                                print(f"[Emby]      创建时间: {item.get('DateCreated')}")
-                    
-                    return items
-                else:
-                    logger.error(f"获取最新项目失败: 状态码={response.status_code}, 耗时: {duration:.2f}秒")
-                    logger.error(f"响应内容: {response.text[:500] if response.text else '无响应内容'}")
-                    print(f"[Emby] 错误: 获取最新项目失败, 状态码={response.status_code}")
-                    print(f"[Emby] 响应内容: {response.text[:200] if response.text else '无响应内容'}")
-                    return []
-                    
         except Exception as e:
             logger.error(f"获取最新项目时出错: {str(e)}", exc_info=True)
             return []
@@ -434,7 +533,7 @@ class EmbyService:
                         
                         if created_timestamp >= start_time:
                             new_items.append(item)
-                            logger.info(f"找到符合条件的项目: ID={item_id}, 名称={item_name}, 类型={item_type}, 添加时间={created_time.strftime('%Y-%m-%d %H:%M:%S')}")
+                            logger.debug("找到符合条件的项目: ID=%s, 名称=%s, 类型=%s, 添加时间=%s", item_id, item_name, item_type, created_time)
                             print(f"[Emby扫描] 找到新项目: {item_name} ({item_type}), 添加时间: {created_time.strftime('%Y-%m-%d %H:%M:%S')}")
                     except Exception as e:
                         logger.warning(f"解析项目时间出错: {str(e)}, 项目: ID={item_id}, 名称={item_name}, 原始时间值: {date_created}")
@@ -454,38 +553,39 @@ class EmbyService:
                 logger.info("没有找到需要刷新的新项目")
                 print(f"[Emby扫描] 没有找到需要刷新的新项目")
             
-            for item in new_items:
+            # 并发执行刷新，结果按原顺序返回
+            refresh_targets = [item for item in new_items if item.get("Id")]
+            for item in refresh_targets:
+                logger.debug("正在刷新项目: ID=%s, 名称=%s, 类型=%s, 路径=%s", item.get('Id'), item.get('Name', '未知'), item.get('Type', '未知'), item.get('Path', '未知'))
+                print(f"[Emby扫描] 正在刷新: {item.get('Name', '未知')} ({item.get('Type', '未知')})")
+            results = await self._refresh_concurrently([item["Id"] for item in refresh_targets])
+            
+            for item, success in zip(refresh_targets, results):
                 item_id = item.get("Id")
                 item_name = item.get("Name", "未知")
                 item_type = item.get("Type", "未知")
                 item_path = item.get("Path", "未知")
                 
-                if item_id:
-                    # 执行刷新
-                    logger.info(f"正在刷新项目: ID={item_id}, 名称={item_name}, 类型={item_type}, 路径={item_path}")
-                    print(f"[Emby扫描] 正在刷新: {item_name} ({item_type})")
-                    success = await self.refresh_emby_item(item_id)
+                if success is True:
+                    refreshed_count += 1
+                    logger.debug("成功刷新项目: ID=%s, 名称=%s", item_id, item_name)
+                    print(f"[Emby扫描] ✓ 成功刷新: {item_name}")
                     
-                    if success:
-                        refreshed_count += 1
-                        logger.info(f"成功刷新项目: ID={item_id}, 名称={item_name}")
-                        print(f"[Emby扫描] ✓ 成功刷新: {item_name}")
-                        
-                        # 记录刷新的项目信息
-                        refreshed_items.append({
-                            "id": item_id,
-                            "name": item_name,
-                            "type": item_type,
-                            "path": item_path,
-                            "year": item.get("ProductionYear")
-                        })
-                    else:
-                        logger.warning(f"刷新项目失败: ID={item_id}, 名称={item_name}")
-                        print(f"[Emby扫描] ✗ 刷新失败: {item_name}")
+                    # 记录刷新的项目信息
+                    refreshed_items.append({
+                        "id": item_id,
+                        "name": item_name,
+                        "type": item_type,
+                        "path": item_path,
+                        "year": item.get("ProductionYear")
+                    })
+                else:
+                    logger.warning(f"刷新项目失败: ID={item_id}, 名称={item_name}")
+                    print(f"[Emby扫描] ✗ 刷新失败: {item_name}")
             
             # 保存本次刷新记录
             if refreshed_items:
-                self._save_last_refresh(refreshed_items)
+                await asyncio.to_thread(self._save_last_refresh, refreshed_items)
                 logger.info(f"已保存刷新记录，共 {len(refreshed_items)} 个项目")
                 print(f"[Emby扫描] 已保存刷新记录，共 {len(refreshed_items)} 个项目")
             
@@ -577,7 +677,7 @@ class EmbyService:
                             if is_strm_path:
                                 strm_count += 1
                                 
-                            logger.info(f"找到符合条件的项目: ID={item_id}, 名称={item_name}, 类型={item_type}, 路径={item_path}, STRM={is_strm_path}, 添加时间={created_time.strftime('%Y-%m-%d %H:%M:%S')}")
+                            logger.debug("找到符合条件的项目: ID=%s, 名称=%s, 类型=%s, 路径=%s, STRM=%s, 添加时间=%s", item_id, item_name, item_type, item_path, is_strm_path, created_time)
                             
                             # 打印详细信息，但根据是否STRM路径进行区分显示
                             if is_strm_path:
@@ -606,7 +706,8 @@ class EmbyService:
             logger.info(f"找到 {len(new_items)} 个最近 {hours} 小时内的新项目，其中 {strm_count} 个是STRM文件")
             print(f"[Emby扫描] 找到 {len(new_items)} 个最近 {hours} 小时内的新项目，其中 {strm_count} 个是STRM文件")
 
-            self._save_last_scan(
+            await asyncio.to_thread(
+                self._save_last_scan,
                 hours,
                 new_items_details,
                 {
@@ -655,6 +756,9 @@ class EmbyService:
                 print(f"[Emby刷新] 错误: Emby服务未启用，请检查配置")
                 return {"success": False, "message": "Emby服务未启用", "refreshed_count": 0, "refreshed_items": []}
             
+            # 去除重复ID（保持原有顺序），同一项目的递归刷新只需发送一次
+            item_ids = list(dict.fromkeys(item_ids or []))
+            
             logger.info(f"开始刷新 {len(item_ids)} 个Emby项目")
             print(f"[Emby刷新] 开始刷新 {len(item_ids)} 个Emby项目")
             
@@ -673,46 +777,45 @@ class EmbyService:
                     "refreshed_items": []
                 }
             
-            # 直接循环刷新每个项目，不获取项目详情
+            # 并发刷新每个项目，不获取项目详情
             for item_id in item_ids:
-                try:
-                    # 执行刷新
-                    logger.info(f"正在刷新项目: ID={item_id}")
-                    print(f"[Emby刷新] 正在刷新: ID={item_id}")
-                    success = await self.refresh_emby_item(item_id)
-                    
-                    if success:
-                        refreshed_count += 1
-                        logger.info(f"成功刷新项目: ID={item_id}")
-                        print(f"[Emby刷新] ✓ 成功刷新: ID={item_id}")
-                        
-                        # 记录刷新的项目信息（基本信息）
-                        refreshed_items.append({
-                            "id": item_id,
-                            "name": f"ID:{item_id}",  # 由于没有获取详情，只显示ID
-                            "type": "unknown"         # 类型未知
-                        })
-                    else:
-                        logger.warning(f"刷新项目失败: ID={item_id}")
-                        print(f"[Emby刷新] ✗ 刷新失败: ID={item_id}")
-                        failed_items.append({
-                            "id": item_id,
-                            "name": f"ID:{item_id}",
-                            "type": "unknown"
-                        })
-                except Exception as e:
-                    logger.error(f"刷新项目出错: ID={item_id}, 错误: {str(e)}")
-                    print(f"[Emby刷新] ✗ 刷新项目出错: ID={item_id}, 错误: {str(e)}")
+                logger.debug("正在刷新项目: ID=%s", item_id)
+                print(f"[Emby刷新] 正在刷新: ID={item_id}")
+            results = await self._refresh_concurrently(item_ids)
+            
+            for item_id, result in zip(item_ids, results):
+                if isinstance(result, Exception):
+                    logger.error(f"刷新项目出错: ID={item_id}, 错误: {str(result)}")
+                    print(f"[Emby刷新] ✗ 刷新项目出错: ID={item_id}, 错误: {str(result)}")
                     failed_items.append({
                         "id": item_id,
                         "name": f"ID:{item_id}",
                         "type": "unknown",
-                        "error": str(e)
+                        "error": str(result)
+                    })
+                elif result:
+                    refreshed_count += 1
+                    logger.debug("成功刷新项目: ID=%s", item_id)
+                    print(f"[Emby刷新] ✓ 成功刷新: ID={item_id}")
+                    
+                    # 记录刷新的项目信息（基本信息）
+                    refreshed_items.append({
+                        "id": item_id,
+                        "name": f"ID:{item_id}",  # 由于没有获取详情，只显示ID
+                        "type": "unknown"         # 类型未知
+                    })
+                else:
+                    logger.warning(f"刷新项目失败: ID={item_id}")
+                    print(f"[Emby刷新] ✗ 刷新失败: ID={item_id}")
+                    failed_items.append({
+                        "id": item_id,
+                        "name": f"ID:{item_id}",
+                        "type": "unknown"
                     })
             
             # 保存本次刷新记录
             if refreshed_items:
-                self._save_last_refresh(refreshed_items)
+                await asyncio.to_thread(self._save_last_refresh, refreshed_items)
                 logger.info(f"已保存刷新记录，共 {len(refreshed_items)} 个项目")
                 print(f"[Emby刷新] 已保存刷新记录，共 {len(refreshed_items)} 个项目")
             
@@ -759,7 +862,7 @@ class EmbyService:
                 return None
             
             # 构建API URL
-            base_url = self.emby_url.rstrip('/')
+            base_url = self._base_url
             url = f"{base_url}/Items/{item_id}"
             
             # 构建查询参数
@@ -768,22 +871,22 @@ class EmbyService:
                 "Fields": "Path,ParentId,Overview,ProductionYear"
             }
             
-            logger.info(f"获取项目详情: ID={item_id}")
+            logger.debug("获取项目详情: ID=%s", item_id)
             print(f"[Emby] 获取项目详情: ID={item_id}")
             
             # 发送请求
-            async with httpx.AsyncClient() as client:
-                response = await client.get(url, params=params, timeout=30)
-                
-                if response.status_code == 200:
-                    data = response.json()
-                    logger.info(f"成功获取项目详情: ID={item_id}, 名称={data.get('Name', '未知')}")
-                    return data
-                else:
-                    logger.error(f"获取项目详情失败: ID={item_id}, 状态码={response.status_code}")
-                    logger.error(f"响应内容: {response.text[:500] if response.text else '无响应内容'}")
-                    return None
-                
+            client = self._get_client()
+            response = await client.get(url, params=params, timeout=30)
+            
+            if response.status_code == 200:
+                data = orjson.loads(response.content)
+                logger.debug("成功获取项目详情: ID=%s, 名称=%s", item_id, data.get('Name', '未知'))
+                return data
+            else:
+                logger.error(f"获取项目详情失败: ID={item_id}, 状态码={response.status_code}")
+                logger.error(f"响应内容: {response.text[:500] if response.text else '无响应内容'}")
+                return None
+            
         except Exception as e:
             logger.error(f"获取项目详情时出错: ID={item_id}, 错误: {str(e)}")
             return None
@@ -804,14 +907,16 @@ class EmbyService:
                 return []
             
             # 构建API URL
-            base_url = self.emby_url.rstrip('/')
+            base_url = self._base_url
             url = f"{base_url}/Items"
             
             # 构建查询参数 - 基于标签搜索
             params = {
                 "api_key": self.api_key,
                 "Recursive": "true",
-                "Fields": "Path,DateCreated,Tags,Overview",
+                "Fields": "Tags",                    # 只需要标签，其余字段不使用
+                "EnableImages": "false",
+                "EnableUserData": "false",
                 "IncludeItemTypes": "Movie,Series",  # 只包含电影和剧集
                 "Tags": tag_name,                    # 按标签过滤
                 "Limit": 1000                        # 设置一个较大的限制
@@ -821,44 +926,45 @@ class EmbyService:
             print(f"[Emby标签] 查找带标签 '{tag_name}' 的项目")
             
             # 发送请求
-            async with httpx.AsyncClient() as client:
-                response = await client.get(url, params=params, timeout=30)
+            client = self._get_client()
+            response = await client.get(url, params=params, timeout=30)
+            
+            if response.status_code == 200:
+                data = orjson.loads(response.content)
+                items = data.get("Items", [])
+                total_items = data.get("TotalRecordCount", 0)
                 
-                if response.status_code == 200:
-                    data = response.json()
-                    items = data.get("Items", [])
-                    total_items = data.get("TotalRecordCount", 0)
-                    
-                    logger.info(f"找到 {len(items)} 个带标签 '{tag_name}' 的项目")
-                    print(f"[Emby标签] 找到 {len(items)} 个带标签 '{tag_name}' 的项目")
-                    
-                    # 记录找到的项目
-                    for i, item in enumerate(items[:10]):  # 只记录前10个项目
-                        logger.debug(f"  {i+1}. ID={item.get('Id')}, 名称={item.get('Name')}, 类型={item.get('Type')}")
-                        print(f"[Emby标签]   {i+1}. ID={item.get('Id')}, 名称={item.get('Name')}, 类型={item.get('Type')}")
-                    
-                    if len(items) > 10:
-                        logger.debug(f"  ... 以及 {len(items) - 10} 个其他项目")
-                        print(f"[Emby标签]   ... 以及 {len(items) - 10} 个其他项目")
-                    
-                    return items
-                else:
-                    logger.error(f"查找带标签的项目失败: 状态码={response.status_code}")
-                    logger.error(f"响应内容: {response.text[:500] if response.text else '无响应内容'}")
-                    print(f"[Emby标签] 错误: 查找带标签的项目失败, 状态码={response.status_code}")
-                    return []
+                logger.info(f"找到 {len(items)} 个带标签 '{tag_name}' 的项目")
+                print(f"[Emby标签] 找到 {len(items)} 个带标签 '{tag_name}' 的项目")
+                
+                # 记录找到的项目
+                for i, item in enumerate(items[:10]):  # 只记录前10个项目
+                    logger.debug(f"  {i+1}. ID={item.get('Id')}, 名称={item.get('Name')}, 类型={item.get('Type')}")
+                    print(f"[Emby标签]   {i+1}. ID={item.get('Id')}, 名称={item.get('Name')}, 类型={item.get('Type')}")
+                
+                if len(items) > 10:
+                    logger.debug(f"  ... 以及 {len(items) - 10} 个其他项目")
+                    print(f"[Emby标签]   ... 以及 {len(items) - 10} 个其他项目")
+                
+                return items
+            else:
+                logger.error(f"查找带标签的项目失败: 状态码={response.status_code}")
+                logger.error(f"响应内容: {response.text[:500] if response.text else '无响应内容'}")
+                print(f"[Emby标签] 错误: 查找带标签的项目失败, 状态码={response.status_code}")
+                return []
         
         except Exception as e:
             logger.error(f"查找带标签的项目时出错: {str(e)}")
             print(f"[Emby标签] 错误: 查找带标签的项目时出错: {str(e)}")
             return []
     
-    async def remove_tag_from_item(self, item_id: str, tag_to_remove: str) -> bool:
+    async def remove_tag_from_item(self, item_id: str, tag_to_remove: str, item_details: Optional[Dict] = None) -> bool:
         """从项目中删除指定标签
         
         Args:
             item_id: 项目ID
             tag_to_remove: 要删除的标签名称
+            item_details: 已获取的项目数据（需包含Tags），提供时不再单独请求项目详情
             
         Returns:
             bool: 操作是否成功
@@ -869,8 +975,9 @@ class EmbyService:
                 print(f"[Emby标签] 错误: Emby服务未启用，请检查配置")
                 return False
             
-            # 首先获取项目当前标签
-            item_details = await self.get_item_details(item_id)
+            # 首先获取项目当前标签，批量查询结果中已带Tags时直接复用
+            if item_details is None or "Tags" not in item_details:
+                item_details = await self.get_item_details(item_id)
             if not item_details:
                 logger.error(f"无法获取项目详情: ID={item_id}")
                 print(f"[Emby标签] 错误: 无法获取项目详情: ID={item_id}")
@@ -889,7 +996,7 @@ class EmbyService:
             new_tags = [tag for tag in current_tags if tag != tag_to_remove]
             
             # 构建API URL
-            base_url = self.emby_url.rstrip('/')
+            base_url = self._base_url
             url = f"{base_url}/Items/{item_id}/Tags"
             
             # 构建请求参数
@@ -902,22 +1009,22 @@ class EmbyService:
                 "Tags": new_tags
             }
             
-            logger.info(f"从项目中删除标签: ID={item_id}, 名称={item_name}, 标签={tag_to_remove}")
+            logger.debug("从项目中删除标签: ID=%s, 名称=%s, 标签=%s", item_id, item_name, tag_to_remove)
             print(f"[Emby标签] 从项目 '{item_name}' 中删除标签 '{tag_to_remove}'")
             
             # 发送请求
-            async with httpx.AsyncClient() as client:
-                response = await client.post(url, params=params, json=data, timeout=30)
-                
-                if response.status_code == 200 or response.status_code == 204:
-                    logger.info(f"成功删除标签: ID={item_id}, 名称={item_name}, 标签={tag_to_remove}")
-                    print(f"[Emby标签] ✓ 成功从 '{item_name}' 删除标签 '{tag_to_remove}'")
-                    return True
-                else:
-                    logger.error(f"删除标签失败: ID={item_id}, 名称={item_name}, 标签={tag_to_remove}, 状态码={response.status_code}")
-                    logger.error(f"响应内容: {response.text[:500] if response.text else '无响应内容'}")
-                    print(f"[Emby标签] ✗ 删除标签失败: ID={item_id}, 名称={item_name}, 状态码={response.status_code}")
-                    return False
+            client = self._get_client()
+            response = await client.post(url, params=params, json=data, timeout=30)
+            
+            if response.status_code == 200 or response.status_code == 204:
+                logger.info(f"成功删除标签: ID={item_id}, 名称={item_name}, 标签={tag_to_remove}")
+                print(f"[Emby标签] ✓ 成功从 '{item_name}' 删除标签 '{tag_to_remove}'")
+                return True
+            else:
+                logger.error(f"删除标签失败: ID={item_id}, 名称={item_name}, 标签={tag_to_remove}, 状态码={response.status_code}")
+                logger.error(f"响应内容: {response.text[:500] if response.text else '无响应内容'}")
+                print(f"[Emby标签] ✗ 删除标签失败: ID={item_id}, 名称={item_name}, 状态码={response.status_code}")
+                return False
         
         except Exception as e:
             logger.error(f"删除标签时出错: ID={item_id}, 标签={tag_to_remove}, 错误: {str(e)}")
@@ -968,7 +1075,7 @@ class EmbyService:
             item_name = item.get("Name", "未知")
             item_type = item.get("Type", "未知")
             
-            success = await self.remove_tag_from_item(item_id, tag_name)
+            success = await self.remove_tag_from_item(item_id, tag_name, item_details=item)
             
             item_result = {
                 "id": item_id,
@@ -8,17 +8,26 @@ from typing import List, Dict, Callable, Any
 class SchedulerService:
     def __init__(self):
         self.settings = Settings()
-        self.scheduler = AsyncIOScheduler()
+        # 任务执行超过一个周期时合并积压的触发，同一任务不并行执行
+        self.scheduler = AsyncIOScheduler(job_defaults={
+            'coalesce': True,
+            'max_instances': 1,
+            'misfire_grace_time': 60
+        })
         self.strm_job = None
         self.archive_job = None
+        # service_manager引用，延迟到首次使用时解析
+        self._service_manager = None
 
     def refresh_settings(self):
         self.settings = Settings()
     
     def _get_service_manager(self):
-        """动态获取service_manager以避免循环依赖"""
-        module = importlib.import_module('services.service_manager')
-        return module.service_manager
+        """动态获取service_manager以避免循环依赖，首次解析后缓存引用"""
+        if self._service_manager is None:
+            module = importlib.import_module('services.service_manager')
+            self._service_manager = module.service_manager
+        return self._service_manager
     
     async def _run_strm_job(self):
         """执行STRM扫描任务"""
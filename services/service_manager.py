@@ -12,56 +12,125 @@ import asyncio
 from config import Settings
 
 class ServiceManager:
-    _instance = None
+    """服务管理器，全局唯一实例为模块级的service_manager
+    
+    各服务在首次访问时才创建，只用到部分服务的脚本和测试不必构造全部服务
+    """
+
+    _SERVICE_NAMES = (
+        'scheduler_service',
+        'strm_service',
+        'copy_service',
+        'telegram_service',
+        'archive_service',
+        'monitor_service',
+        'health_service',
+        'emby_service',
+        'strm_assistant_service',
+    )
 
-    def __new__(cls):
-        if cls._instance is None:
-            cls._instance = super(ServiceManager, cls).__new__(cls)
-            cls._instance.initialized = False
-        return cls._instance
+    # 固定实例属性，服务实例存放在下划线槽位中，由同名属性在首次访问时创建
+    __slots__ = (
+        'settings',
+        '_scheduler_service',
+        '_strm_service',
+        '_copy_service',
+        '_telegram_service',
+        '_archive_service',
+        '_monitor_service',
+        '_health_service',
+        '_emby_service',
+        '_strm_assistant_service',
+        '_bg_tasks',
+    )
 
     def __init__(self):
-        if not self.initialized:
-            self.settings = Settings()
-            self.scheduler_service = None
-            self.strm_service = None
-            self.copy_service = None
-            self.telegram_service = None
-            self.archive_service = None
-            self.monitor_service = None
-            self.health_service = None
-            self.emby_service = None
-            self.strm_assistant_service = None
-            self.initialized = True
+        self.settings = Settings()
+        self._scheduler_service = None
+        self._strm_service = None
+        self._copy_service = None
+        self._telegram_service = None
+        self._archive_service = None
+        self._monitor_service = None
+        self._health_service = None
+        self._emby_service = None
+        self._strm_assistant_service = None
+        # 持有后台任务的引用，防止任务被提前回收，并在关闭时统一取消
+        self._bg_tasks = set()
     
     def init_services(self):
         """初始化所有服务实例"""
-        if not any([self.scheduler_service, self.strm_service, self.copy_service, 
-                   self.telegram_service, self.archive_service, self.monitor_service,
-                   self.health_service, self.emby_service, self.strm_assistant_service]):
-            self.scheduler_service = SchedulerService()
-            self.copy_service = CopyService()
-            self.strm_service = StrmService()
-            self.telegram_service = TelegramService()
-            self.archive_service = ArchiveService()
-            self.monitor_service = StrmMonitorService(self.strm_service)
-            self.health_service = StrmHealthService()
-            self.emby_service = EmbyService()
-            self.strm_assistant_service = StrmAssistantService()
+        for name in self._SERVICE_NAMES:
+            getattr(self, name)
+
+    @property
+    def scheduler_service(self):
+        if self._scheduler_service is None:
+            self._scheduler_service = SchedulerService()
+        return self._scheduler_service
+
+    @property
+    def strm_service(self):
+        if self._strm_service is None:
+            self._strm_service = StrmService()
+        return self._strm_service
+
+    @property
+    def copy_service(self):
+        if self._copy_service is None:
+            self._copy_service = CopyService()
+        return self._copy_service
+
+    @property
+    def telegram_service(self):
+        if self._telegram_service is None:
+            self._telegram_service = TelegramService()
+        return self._telegram_service
+
+    @property
+    def archive_service(self):
+        if self._archive_service is None:
+            self._archive_service = ArchiveService()
+        return self._archive_service
+
+    @property
+    def monitor_service(self):
+        if self._monitor_service is None:
+            self._monitor_service = StrmMonitorService(self.strm_service)
+        return self._monitor_service
+
+    @property
+    def health_service(self):
+        if self._health_service is None:
+            self._health_service = StrmHealthService()
+        return self._health_service
+
+    @property
+    def emby_service(self):
+        if self._emby_service is None:
+            self._emby_service = EmbyService()
+        return self._emby_service
+
+    @property
+    def strm_assistant_service(self):
+        if self._strm_assistant_service is None:
+            self._strm_assistant_service = StrmAssistantService(self.settings)
+        return self._strm_assistant_service
 
     def reload_runtime_config(self):
         """重新加载运行时配置并同步到已初始化服务"""
         self.settings = Settings()
 
+        # 只同步已经创建的服务，不因重载配置而实例化未使用的服务
         services = [
-            self.scheduler_service,
-            self.strm_service,
-            self.copy_service,
-            self.telegram_service,
-            self.archive_service,
-            self.health_service,
-            self.emby_service,
-            self.strm_assistant_service,
+            self._scheduler_service,
+            self._strm_service,
+            self._copy_service,
+            self._telegram_service,
+            self._archive_service,
+            self._health_service,
+            self._emby_service,
+            self._strm_assistant_service,
         ]
 
         for service in services:
@@ -69,7 +138,8 @@ class ServiceManager:
                 service.refresh_settings()
             elif service and hasattr(service, "settings"):
                 try:
-                    service.settings = Settings()
+                    # 复用刚加载的配置，不再为每个服务重新解析
+                    service.settings = self.settings
                 except AttributeError:
                     logger.debug(f"服务 {service.__class__.__name__} 的 settings 为只读，跳过直接赋值")
     
@@ -94,13 +164,17 @@ class ServiceManager:
             # 初始化归档服务
             logger.info("归档服务初始化完成")
             
-            # 初始化监控服务
-            await self.monitor_service.start()
-            logger.info("监控服务初始化完成")
-            
-            # 初始化Telegram服务
-            await self.telegram_service.initialize()
-            logger.info("Telegram服务初始化完成")
+            # 监控服务和Telegram服务互不依赖，并发初始化
+            results = await asyncio.gather(
+                self.monitor_service.start(),
+                self.telegram_service.initialize(),
+                return_exceptions=True
+            )
+            for name, result in zip(("监控服务", "Telegram服务"), results):
+                if isinstance(result, Exception):
+                    logger.error(f"{name}初始化失败: {str(result)}")
+                    raise result
+                logger.info(f"{name}初始化完成")
             
             # 初始化Emby服务
             logger.info("Emby服务初始化完成")
@@ -126,7 +200,7 @@ class ServiceManager:
             await self.archive_service.initialize()
             
             # 启动Emby刷新任务
-            asyncio.create_task(self.emby_service.start_background_tasks())
+            self._spawn(self.emby_service.start_background_tasks())
             logger.info("Emby刷新任务已启动")
             
             # 如果启用了定时任务，启动定时任务
@@ -139,11 +213,18 @@ class ServiceManager:
                 
             # 如果配置了启动后执行，开始STRM扫描
             if self.settings.run_after_startup:
-                asyncio.create_task(self._run_start_scan())
+                self._spawn(self._run_start_scan())
         except Exception as e:
             logger.error(f"服务启动失败: {str(e)}")
             raise
     
+    def _spawn(self, coro):
+        """创建并跟踪后台任务，任务结束后自动移除"""
+        task = asyncio.create_task(coro)
+        self._bg_tasks.add(task)
+        task.add_done_callback(self._bg_tasks.discard)
+        return task
+    
     async def _start_schedule(self):
         """启动STRM定时任务"""
         if not self.settings.schedule_enabled:
@@ -224,20 +305,42 @@ class ServiceManager:
     async def close(self):
         """关闭所有服务"""
         try:
-            if self.strm_service:
-                await self.strm_service.close()
-            
-            if self.copy_service:
-                await self.copy_service.close()
+            # 先取消仍在运行的后台任务
+            if self._bg_tasks:
+                tasks = list(self._bg_tasks)
+                for task in tasks:
+                    task.cancel()
+                await asyncio.gather(*tasks, return_exceptions=True)
             
-            if self.telegram_service:
-                await self.telegram_service.close()
-            
-            if self.monitor_service:
-                await self.monitor_service.stop()
+            # 先停止监控并处理完剩余的文件事件，事件处理会更新健康状态数据
+            if self._monitor_service:
+                try:
+                    await self.monitor_service.stop()
+                except Exception as e:
+                    logger.error(f"监控服务关闭失败: {str(e)}")
             
-            if self.emby_service:
+            # 其余服务的关闭互不依赖，并发执行，总耗时取决于最慢的一个
+            closers = []
+            if self._strm_service:
+                closers.append(("STRM服务", self.strm_service.close()))
+            if self._copy_service:
+                closers.append(("复制服务", self.copy_service.close()))
+            if self._telegram_service:
+                closers.append(("Telegram服务", self.telegram_service.close()))
+            if self._health_service:
+                closers.append(("健康状态服务", self.health_service.close()))
+            if self._emby_service:
                 self.emby_service.stop_background_tasks()
+                closers.append(("Emby服务", self.emby_service.close()))
+            
+            results = await asyncio.gather(*(coro for _, coro in closers), return_exceptions=True)
+            errors = []
+            for (name, _), result in zip(closers, results):
+                if isinstance(result, Exception):
+                    logger.error(f"{name}关闭失败: {str(result)}")
+                    errors.append(result)
+            if errors:
+                raise errors[0]
             
             logger.info("所有服务已关闭")
         except Exception as e:
@@ -245,16 +348,23 @@ class ServiceManager:
             raise
 
 # 全局服务管理器实例
-service_manager = ServiceManager() 
+service_manager = ServiceManager()
+
+# 兼容旧的模块级导出，按需从service_manager获取（也会触发服务的延迟创建）
+_SERVICE_ALIASES = {
+    'scheduler_service': 'scheduler_service',
+    'strm_service': 'strm_service',
+    'copy_service': 'copy_service',
+    'tg_service': 'telegram_service',
+    'archive_service': 'archive_service',
+    'monitor_service': 'monitor_service',
+    'health_service': 'health_service',
+    'emby_service': 'emby_service',
+    'strm_assistant_service': 'strm_assistant_service',
+}
+
 
-# 确保在初始化后导出服务实例
-service_manager.init_services()
-scheduler_service = service_manager.scheduler_service
-strm_service = service_manager.strm_service
-copy_service = service_manager.copy_service
-tg_service = service_manager.telegram_service
-archive_service = service_manager.archive_service
-monitor_service = service_manager.monitor_service
-health_service = service_manager.health_service
-emby_service = service_manager.emby_service
-strm_assistant_service = service_manager.strm_assistant_service 
+def __getattr__(name):
+    if name in _SERVICE_ALIASES:
+        return getattr(service_manager, _SERVICE_ALIASES[name])
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,27 +1,61 @@
 import os
-import json
+import re
+import orjson
+import asyncio
 import shutil
 import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from itertools import islice, repeat
 from typing import Dict, List, Optional, Any, Tuple
 import webbrowser
 from config import Settings
 
 logger = logging.getLogger(__name__)
 
+# 季/集元数据文件名，一次匹配同时完成过滤和编号提取
+_SEASON_RE = re.compile(r"^season-(\d+)\.json$")
+_EPISODE_RE = re.compile(r"^season-(\d+)-episode-(\d+)\.json$")
+
 class StrmAssistantService:
     """TMDB元数据助手服务，用于管理和操作TMDB元数据缓存"""
     
-    def __init__(self):
-        """初始化TMDB元数据助手服务"""
+    # 加载元数据时并发读取JSON文件的线程数
+    LOAD_WORKERS = 16
+    # 删除元数据文件时并发unlink的线程数
+    DELETE_WORKERS = 16
+    # 列表页只用到的字段，增量索引中只保留这些以节省内存
+    SUMMARY_FIELDS = ("id", "title", "name", "first_air_date", "release_date")
+    
+    def __init__(self, settings: Optional[Settings] = None):
+        """初始化TMDB元数据助手服务
+        
+        Args:
+            settings: 已加载的配置，由服务管理器传入时复用，避免重复解析配置
+        """
         # 初始化变量
-        self.settings = Settings()
+        self.settings = settings or Settings()
         self.cache_path = self.settings.tmdb_cache_dir
         self.all_items = {
             "tmdb-tv": {},
             "tmdb-movies2": {},
             "tmdb-collections": {}
         }
+        # 搜索索引: item_iid -> (小写名称, TMDB ID, 项目数据)，加载时构建一次
+        self._search_index = {
+            "tmdb-tv": {},
+            "tmdb-movies2": {},
+            "tmdb-collections": {}
+        }
+        # 增量加载索引: 项目目录 -> ((文件路径, mtime, 大小), 摘要)，文件未变化时跳过重新解析
+        self._entry_index = {
+            "tmdb-tv": {},
+            "tmdb-movies2": {},
+            "tmdb-collections": {}
+        }
+        # 集文件分组缓存: 项目目录 -> (目录mtime, {季号: [(集号, 文件名)]})
+        self._episode_cache = {}
         
         # 确保缓存目录存在
         if self.cache_path:
@@ -77,14 +111,7 @@ class StrmAssistantService:
             os.makedirs(subdir_path, exist_ok=True)
             logger.info(f"确保子目录存在: {subdir_path}")
         
-        # 初始化搜索缓存
-        self.all_items = {
-            "tmdb-tv": {},
-            "tmdb-movies2": {},
-            "tmdb-collections": {}
-        }
-        
-        # 加载各类型数据
+        # 加载各类型数据，每个类型加载完成后整体替换，加载期间的搜索仍使用旧数据
         tv_count = self.load_type_metadata("tmdb-tv")
         movie_count = self.load_type_metadata("tmdb-movies2")
         collection_count = self.load_type_metadata("tmdb-collections")
@@ -111,54 +138,117 @@ class StrmAssistantService:
         
         if not os.path.exists(type_path):
             logger.warning(f"类型目录不存在: {type_path}")
+            self.all_items[data_type] = {}
+            self._search_index[data_type] = {}
             return 0
         
         # 初始化计数器
         item_count = 0
         
-        # 遍历目录
-        for item in os.listdir(type_path):
-            item_path = os.path.join(type_path, item)
-            if os.path.isdir(item_path):
-                # 尝试加载主JSON文件
-                json_file = os.path.join(item_path, "series.json" if data_type == "tmdb-tv" else "movie.json")
-                all_json_file = os.path.join(item_path, "all.json")
-                data = {}
-                
-                # 优先尝试加载all.json
-                if os.path.exists(all_json_file):
-                    try:
-                        with open(all_json_file, "r", encoding="utf-8") as f:
-                            data = json.load(f)
-                    except Exception as e:
-                        logger.error(f"加载{all_json_file}时出错: {str(e)}")
-                elif os.path.exists(json_file):
-                    try:
-                        with open(json_file, "r", encoding="utf-8") as f:
-                            data = json.load(f)
-                    except Exception as e:
-                        logger.error(f"加载{json_file}时出错: {str(e)}")
+        # 遍历目录，scandir返回的条目自带类型信息，无需逐项stat
+        with os.scandir(type_path) as entries:
+            item_dirs = [(entry.name, entry.path) for entry in entries if entry.is_dir()]
+        
+        # 先填充新字典再整体替换，后台线程加载时不影响正在进行的搜索
+        items = {}
+        search_index = {}
+        entry_index = {}
+        previous_index = self._entry_index.get(data_type, {})
+        
+        # 各项目的JSON文件互不相关，用线程池并发读取
+        is_tv = data_type == "tmdb-tv"
+        with ThreadPoolExecutor(max_workers=self.LOAD_WORKERS) as executor:
+            loaded = executor.map(self._load_item_summary, (path for _, path in item_dirs),
+                                  repeat(is_tv), repeat(previous_index))
+            
+            for (item, item_path), (signature, data) in zip(item_dirs, loaded):
+                if signature:
+                    entry_index[item_path] = (signature, data)
                 
                 # 提取基本信息
                 item_id = data.get("id", item)
                 name = data.get("title", data.get("name", ""))  # 优先使用title字段
                 date_str = data.get("first_air_date", data.get("release_date", ""))
-                year = self.format_date(date_str)[:4] if date_str else ""
+                # 年份即日期字符串前4位，无需再格式化
+                year = date_str[:4] if date_str else ""
                 
                 # 添加到搜索缓存
                 item_iid = f"{data_type}_{item_id}"
-                self.all_items[data_type][item_iid] = {
+                item_data = {
                     "name": name,
                     "id": item_id,
                     "year": year,
                     "path": item_path
                 }
+                items[item_iid] = item_data
+                search_index[item_iid] = (name.lower(), str(item_id), item_data)
                 
                 # 增加计数器
                 item_count += 1
         
+        self.all_items[data_type] = items
+        self._search_index[data_type] = search_index
+        self._entry_index[data_type] = entry_index
         return item_count
     
+    def _load_item_summary(self, dir_path: str, is_tv: bool, previous_index: Dict) -> Tuple[Optional[Tuple], Dict]:
+        """加载项目摘要，主JSON文件的mtime和大小未变时直接复用上次的结果
+        
+        Args:
+            dir_path: 项目目录
+            is_tv: 是否为剧集
+            previous_index: 上次加载的增量索引
+            
+        Returns:
+            Tuple[Optional[Tuple], Dict]: (文件签名, 摘要)，没有JSON文件时签名为None
+        """
+        # 文件名固定且不含分隔符，直接拼接字符串，省去os.path.join的开销
+        base = dir_path + os.sep
+        for json_name in ("all.json", "series.json" if is_tv else "movie.json"):
+            json_file = base + json_name
+            try:
+                st = os.stat(json_file)
+            except FileNotFoundError:
+                continue
+            
+            signature = (json_file, st.st_mtime_ns, st.st_size)
+            cached = previous_index.get(dir_path)
+            if cached and cached[0] == signature:
+                return cached
+            
+            try:
+                with open(json_file, "rb") as f:
+                    data = orjson.loads(f.read())
+            except Exception as e:
+                logger.error(f"加载{json_file}时出错: {str(e)}")
+                return None, {}
+            return signature, {key: data[key] for key in self.SUMMARY_FIELDS if key in data}
+        return None, {}
+    
+    def _load_primary_json(self, dir_path: str, is_tv: bool) -> Dict:
+        """加载项目目录下的主JSON文件，优先all.json，其次series.json/movie.json
+        
+        Args:
+            dir_path: 项目目录
+            is_tv: 是否为剧集
+            
+        Returns:
+            Dict: JSON数据，文件不存在或加载失败时返回空字典
+        """
+        # 文件名固定且不含分隔符，直接拼接字符串，省去os.path.join的开销
+        base = dir_path + os.sep
+        for json_name in ("all.json", "series.json" if is_tv else "movie.json"):
+            json_file = base + json_name
+            try:
+                with open(json_file, "rb") as f:
+                    return orjson.loads(f.read())
+            except FileNotFoundError:
+                continue
+            except Exception as e:
+                logger.error(f"加载{json_file}时出错: {str(e)}")
+                return {}
+        return {}
+    
     def format_date(self, date_str: str) -> str:
         """格式化日期，只保留年月日部分
         
@@ -172,51 +262,46 @@ class StrmAssistantService:
             return ""
         
         try:
-            # 尝试解析带时间的日期格式
-            if "T" in date_str:
-                dt = datetime.strptime(date_str.split("T")[0], "%Y-%m-%d")
-                return dt.strftime("%Y-%m-%d")
-            # 尝试解析简单日期格式
-            else:
-                dt = datetime.strptime(date_str, "%Y-%m-%d")
-                return dt.strftime("%Y-%m-%d")
+            # 去掉时间部分后解析，未补零的日期（如2023-1-5）也会被规范化
+            dt = datetime.strptime(date_str.split("T", 1)[0], "%Y-%m-%d")
+            return dt.strftime("%Y-%m-%d")
         except ValueError:
             return date_str
     
-    def search_items(self, search_term: str) -> Dict[str, List[Dict]]:
+    def search_items(self, search_term: str, limit: Optional[int] = None, offset: int = 0) -> Dict[str, List[Dict]]:
         """搜索项目
         
         Args:
             search_term: 搜索关键词
+            limit: 每个类型最多返回的数量，None表示不限制
+            offset: 每个类型跳过的结果数量
             
         Returns:
             Dict[str, List[Dict]]: 按类型分组的搜索结果
         """
         search_term = search_term.lower()
+        # 只物化请求的分页窗口
+        stop = offset + limit if limit is not None else None
         
         if not search_term:
             # 如果搜索词为空，返回所有项目
             return {
-                "tmdb-tv": list(self.all_items["tmdb-tv"].values()),
-                "tmdb-movies2": list(self.all_items["tmdb-movies2"].values()),
-                "tmdb-collections": list(self.all_items["tmdb-collections"].values())
+                "tmdb-tv": list(islice(self.all_items["tmdb-tv"].values(), offset, stop)),
+                "tmdb-movies2": list(islice(self.all_items["tmdb-movies2"].values(), offset, stop)),
+                "tmdb-collections": list(islice(self.all_items["tmdb-collections"].values(), offset, stop))
             }
         
         # 搜索结果
-        results = {
-            "tmdb-tv": [],
-            "tmdb-movies2": [],
-            "tmdb-collections": []
-        }
+        results = {}
         
-        # 在每个类型中搜索匹配的项目
+        # 在每个类型中搜索匹配的项目，名称已在索引中预先转为小写
         for data_type in ["tmdb-tv", "tmdb-movies2", "tmdb-collections"]:
-            for item_id, item_data in self.all_items[data_type].items():
-                name = item_data["name"].lower()
-                tmdb_id = item_id.split("_")[1]
-                
-                if search_term in name or search_term in tmdb_id:
-                    results[data_type].append(item_data)
+            # 取快照遍历，避免与线程中的删除操作并发修改字典
+            candidates = list(self._search_index[data_type].values())
+            matches = (item_data for name, tmdb_id, item_data in candidates
+                       if search_term in name or search_term in tmdb_id)
+            # 凑够一页即停止匹配
+            results[data_type] = list(islice(matches, offset, stop))
         
         return results
     
@@ -237,24 +322,8 @@ class StrmAssistantService:
             logger.warning(f"项目路径不存在: {type_path}")
             return None
         
-        # 尝试加载JSON文件
-        json_file = os.path.join(type_path, "series.json" if data_type == "tmdb-tv" else "movie.json")
-        all_json_file = os.path.join(type_path, "all.json")
-        data = {}
-        
-        # 优先尝试加载all.json
-        if os.path.exists(all_json_file):
-            try:
-                with open(all_json_file, "r", encoding="utf-8") as f:
-                    data = json.load(f)
-            except Exception as e:
-                logger.error(f"加载{all_json_file}时出错: {str(e)}")
-        elif os.path.exists(json_file):
-            try:
-                with open(json_file, "r", encoding="utf-8") as f:
-                    data = json.load(f)
-            except Exception as e:
-                logger.error(f"加载{json_file}时出错: {str(e)}")
+        # 优先加载all.json，其次series.json/movie.json
+        data = self._load_primary_json(type_path, data_type == "tmdb-tv")
         
         if not data:
             logger.warning(f"未找到项目元数据: {data_type}/{item_id}")
@@ -287,8 +356,8 @@ class StrmAssistantService:
         
         # 加载季节数据
         try:
-            with open(season_file, "r", encoding="utf-8") as f:
-                season_data = json.load(f)
+            with open(season_file, "rb") as f:
+                season_data = orjson.loads(f.read())
             return season_data
         except Exception as e:
             logger.error(f"加载季节数据出错: {str(e)}")
@@ -320,8 +389,8 @@ class StrmAssistantService:
         
         # 加载集数据
         try:
-            with open(episode_file, "r", encoding="utf-8") as f:
-                episode_data = json.load(f)
+            with open(episode_file, "rb") as f:
+                episode_data = orjson.loads(f.read())
             return episode_data
         except Exception as e:
             logger.error(f"加载集数据出错: {str(e)}")
@@ -349,17 +418,21 @@ class StrmAssistantService:
             return []
         
         # 查找所有季文件
-        season_files = [f for f in os.listdir(type_path) if f.startswith("season-") and f.endswith(".json") and "-episode-" not in f]
+        season_files = []
+        for f in os.listdir(type_path):
+            match = _SEASON_RE.match(f)
+            if match:
+                season_files.append((int(match.group(1)), f))
         
         seasons = []
+        base = type_path + os.sep
         
-        for season_file in season_files:
+        for season_number, season_file in season_files:
             try:
-                season_number = int(season_file.split("-")[1].split(".")[0])
-                season_path = os.path.join(type_path, season_file)
+                season_path = base + season_file
                 
-                with open(season_path, "r", encoding="utf-8") as f:
-                    season_data = json.load(f)
+                with open(season_path, "rb") as f:
+                    season_data = orjson.loads(f.read())
                 
                 seasons.append({
                     "season_number": season_number,
@@ -398,18 +471,17 @@ class StrmAssistantService:
             return []
         
         # 查找指定季的所有集文件
-        episode_files = [f for f in os.listdir(type_path) 
-                      if f.startswith(f"season-{season_number}-episode-") and f.endswith(".json")]
+        episode_files = self._scan_episodes(type_path).get(season_number, [])
         
         episodes = []
+        base = type_path + os.sep
         
-        for episode_file in episode_files:
+        for episode_number, episode_file in episode_files:
             try:
-                episode_number = int(episode_file.split("-")[3].split(".")[0])
-                episode_path = os.path.join(type_path, episode_file)
+                episode_path = base + episode_file
                 
-                with open(episode_path, "r", encoding="utf-8") as f:
-                    episode_data = json.load(f)
+                with open(episode_path, "rb") as f:
+                    episode_data = orjson.loads(f.read())
                 
                 episodes.append({
                     "episode_number": episode_number,
@@ -425,6 +497,32 @@ class StrmAssistantService:
         episodes.sort(key=lambda x: x["episode_number"])
         return episodes
     
+    def _scan_episodes(self, type_path: str) -> Dict[int, List[Tuple[int, str]]]:
+        """扫描项目目录一次，按季号分组所有集文件
+        
+        结果按目录mtime缓存，逐季获取集列表时无需反复扫描整个目录
+        
+        Args:
+            type_path: 项目目录
+            
+        Returns:
+            Dict[int, List[Tuple[int, str]]]: 季号 -> [(集号, 文件名)]
+        """
+        mtime = os.stat(type_path).st_mtime_ns
+        cached = self._episode_cache.get(type_path)
+        if cached and cached[0] == mtime:
+            return cached[1]
+        
+        buckets = {}
+        with os.scandir(type_path) as entries:
+            for entry in entries:
+                match = _EPISODE_RE.match(entry.name)
+                if match:
+                    buckets.setdefault(int(match.group(1)), []).append((int(match.group(2)), entry.name))
+        
+        self._episode_cache[type_path] = (mtime, buckets)
+        return buckets
+    
     def delete_item(self, data_type: str, item_id: str) -> bool:
         """删除项目
         
@@ -444,12 +542,17 @@ class StrmAssistantService:
         
         try:
             # 删除目录及其内容
-            shutil.rmtree(type_path)
+            self._remove_item_dir(type_path)
             
             # 从搜索缓存中删除
             item_iid = f"{data_type}_{item_id}"
             if data_type in self.all_items and item_iid in self.all_items[data_type]:
                 del self.all_items[data_type][item_iid]
+            if data_type in self._search_index:
+                self._search_index[data_type].pop(item_iid, None)
+            if data_type in self._entry_index:
+                self._entry_index[data_type].pop(type_path, None)
+            self._episode_cache.pop(type_path, None)
             
             logger.info(f"成功删除项目: {data_type}/{item_id}")
             return True
@@ -457,6 +560,30 @@ class StrmAssistantService:
             logger.error(f"删除项目失败: {str(e)}")
             return False
     
+    def _unlink_files(self, paths: List[str]) -> None:
+        """并发删除一组文件，unlink阻塞在文件系统时会释放GIL"""
+        if len(paths) <= 1:
+            for path in paths:
+                os.unlink(path)
+            return
+        with ThreadPoolExecutor(max_workers=self.DELETE_WORKERS) as executor:
+            # 消费结果，使unlink的异常抛出
+            list(executor.map(os.unlink, paths))
+    
+    def _remove_item_dir(self, item_path: str) -> None:
+        """删除项目目录，目录只含文件时并发删除，否则或出错时回退到shutil.rmtree"""
+        try:
+            with os.scandir(item_path) as entries:
+                files = []
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        raise IsADirectoryError(entry.path)
+                    files.append(entry.path)
+            self._unlink_files(files)
+            os.rmdir(item_path)
+        except OSError:
+            shutil.rmtree(item_path)
+    
     def delete_season(self, data_type: str, item_id: str, season_number: int) -> bool:
         """删除季节
         
@@ -480,15 +607,21 @@ class StrmAssistantService:
             return False
         
         try:
-            # 删除季文件
+            # 删除季文件，不存在时忽略，省去一次exists检查
             season_file = os.path.join(type_path, f"season-{season_number}.json")
-            if os.path.exists(season_file):
-                os.remove(season_file)
+            try:
+                os.unlink(season_file)
+            except FileNotFoundError:
+                pass
             
-            # 删除所有集文件
-            for f in os.listdir(type_path):
-                if f.startswith(f"season-{season_number}-episode-") and f.endswith(".json"):
-                    os.remove(os.path.join(type_path, f))
+            # 单次scandir收集所有集文件后统一删除
+            episode_prefix = f"season-{season_number}-episode-"
+            with os.scandir(type_path) as entries:
+                episode_files = [entry.path for entry in entries
+                                 if entry.name.startswith(episode_prefix) and entry.name.endswith(".json")]
+            self._unlink_files(episode_files)
+            # 目录mtime精度可能不足，显式使分组缓存失效
+            self._episode_cache.pop(type_path, None)
             
             logger.info(f"成功删除季节: {data_type}/{item_id}/第{season_number}季")
             return True
@@ -524,6 +657,7 @@ class StrmAssistantService:
             episode_file = os.path.join(type_path, f"season-{season_number}-episode-{episode_number}.json")
             if os.path.exists(episode_file):
                 os.remove(episode_file)
+                self._episode_cache.pop(type_path, None)
                 logger.info(f"成功删除集: {data_type}/{item_id}/第{season_number}季/第{episode_number}集")
                 return True
             else:
@@ -533,6 +667,26 @@ class StrmAssistantService:
             logger.error(f"删除集失败: {str(e)}")
             return False
     
+    async def load_all_metadata_async(self) -> Dict[str, int]:
+        """在线程中加载所有元数据，避免阻塞事件循环"""
+        return await asyncio.to_thread(self.load_all_metadata)
+    
+    async def get_item_metadata_async(self, data_type: str, item_id: str) -> Optional[Dict]:
+        """在线程中获取项目元数据"""
+        return await asyncio.to_thread(self.get_item_metadata, data_type, item_id)
+    
+    async def get_seasons_async(self, data_type: str, item_id: str) -> List[Dict]:
+        """在线程中获取项目的所有季节信息"""
+        return await asyncio.to_thread(self.get_seasons, data_type, item_id)
+    
+    async def get_episodes_async(self, data_type: str, item_id: str, season_number: int) -> List[Dict]:
+        """在线程中获取指定季的所有集信息"""
+        return await asyncio.to_thread(self.get_episodes, data_type, item_id, season_number)
+    
+    async def delete_item_async(self, data_type: str, item_id: str) -> bool:
+        """在线程中删除项目"""
+        return await asyncio.to_thread(self.delete_item, data_type, item_id)
+    
     def get_tmdb_url(self, data_type: str, item_id: str) -> str:
         """获取TMDB网站URL
         
@@ -560,11 +714,12 @@ class StrmAssistantService:
             item_id: 项目ID
             
         Returns:
-            bool: 是否成功打开
+            bool: 是否成功发起打开操作
         """
         url = self.get_tmdb_url(data_type, item_id)
         try:
-            webbrowser.open(url)
+            # 启动浏览器可能阻塞数百毫秒，放到后台线程中执行，调用方立即返回
+            threading.Thread(target=webbrowser.open, args=(url,), daemon=True).start()
             return True
         except Exception as e:
             logger.error(f"在浏览器中打开TMDB URL失败: {str(e)}")
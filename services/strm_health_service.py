@@ -1,8 +1,12 @@
 import os
-import json
+import mmap
+import asyncio
+import orjson
 import time
 import logging
+import threading
 from pathlib import Path
+from contextlib import contextmanager
 from typing import Dict, List, Optional, Any, Tuple
 import importlib
 
@@ -13,6 +17,12 @@ class StrmHealthService:
     
     用于管理和维护STRM文件的健康状态信息
     """
+    
+    # 延迟保存的合并窗口（秒），窗口内的多次修改只写一次文件
+    SAVE_DELAY = 0.5
+    # 超过该大小的健康数据文件加载时提示内核顺序预读
+    SEQUENTIAL_HINT_SIZE = 128 * 1024 * 1024
+    
     def __init__(self):
         """初始化STRM健康状态服务"""
         self._settings = None
@@ -23,6 +33,17 @@ class StrmHealthService:
         }
         self._health_file = "data/strm_health.json"
         self._is_loaded = False
+        # 已加载数据对应的文件mtime，文件未变化时不重复解析
+        self._mtime = None
+        # 内存数据有未保存的修改
+        self._dirty = False
+        # 内存数据的修改代数和已写入文件的代数，用于判断写入期间数据是否又有变化
+        self._generation = 0
+        self._saved_generation = 0
+        # 事件循环线程和写文件线程可能同时保存，串行化文件写入
+        self._write_lock = threading.Lock()
+        self._save_task = None
+        self._batch_depth = 0
         
     @property
     def settings(self):
@@ -37,37 +58,84 @@ class StrmHealthService:
         module = importlib.import_module('services.service_manager')
         return module.service_manager
     
+    def _ensure_loaded(self) -> None:
+        """首次使用时加载数据，之后只读内存，不再逐次检查文件"""
+        if not self._is_loaded:
+            self.load_health_data()
+    
     def load_health_data(self) -> bool:
-        """从JSON文件加载健康状态数据"""
-        if self._is_loaded:
-            return True
-            
+        """从JSON文件加载健康状态数据，文件mtime未变化时直接使用已加载的数据"""
         try:
             # 确保目录存在
             os.makedirs(os.path.dirname(self._health_file), exist_ok=True)
             
-            if os.path.exists(self._health_file):
-                with open(self._health_file, 'r', encoding='utf-8') as f:
-                    self._health_data = json.load(f)
-                logger.info(f"已加载STRM健康状态数据，包含 {len(self._health_data.get('strmFiles', {}))} 个STRM文件和 {len(self._health_data.get('videoFiles', {}))} 个视频文件")
-                self._is_loaded = True
-                return True
-            else:
-                logger.info("STRM健康状态数据文件不存在，将使用空数据")
-                self._is_loaded = True
+            try:
+                stat = os.stat(self._health_file)
+            except FileNotFoundError:
+                if not self._is_loaded:
+                    logger.info("STRM健康状态数据文件不存在，将使用空数据")
+                    self._is_loaded = True
                 return False
+            
+            if self._is_loaded and stat.st_mtime_ns == self._mtime:
+                return True
+            
+            if self._is_loaded and self._dirty:
+                # 内存中有尚未保存的修改，重新加载会丢失它们，保留内存数据等待保存
+                logger.warning("STRM健康状态数据文件已在外部修改，但内存中有未保存的修改，跳过重新加载")
+                return True
+            
+            self._health_data = self._read_health_file(stat.st_size)
+            self._mtime = stat.st_mtime_ns
+            # 内存数据与文件一致
+            self._saved_generation = self._generation
+            logger.info(f"已加载STRM健康状态数据，包含 {len(self._health_data.get('strmFiles', {}))} 个STRM文件和 {len(self._health_data.get('videoFiles', {}))} 个视频文件")
+            self._is_loaded = True
+            return True
         except Exception as e:
             logger.error(f"加载STRM健康状态数据失败: {str(e)}")
             return False
     
-    def save_health_data(self) -> bool:
-        """保存健康状态数据到JSON文件"""
+    def _read_health_file(self, size: int) -> Dict:
+        """通过mmap把健康数据文件交给orjson解析，不在Python中额外复制一份文件内容"""
+        if not size:
+            # 空文件无法mmap，交给orjson报出解析错误
+            return orjson.loads(b"")
+        with open(self._health_file, 'rb') as f:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                if size >= self.SEQUENTIAL_HINT_SIZE and hasattr(mm, 'madvise'):
+                    mm.madvise(mmap.MADV_SEQUENTIAL)
+                with memoryview(mm) as view:
+                    return orjson.loads(view)
+    
+    def _mark_dirty(self) -> None:
+        """标记内存数据有未保存的修改"""
+        self._dirty = True
+        self._generation += 1
+    
+    def _snapshot(self) -> Tuple[int, bytes]:
+        """在修改数据的线程中序列化，得到与当前代数一致的快照"""
+        return self._generation, orjson.dumps(self._health_data, option=orjson.OPT_INDENT_2)
+    
+    def _write_snapshot(self, generation: int, payload: bytes) -> bool:
+        """把快照写入文件，可在工作线程中执行"""
         try:
-            # 确保目录存在
-            os.makedirs(os.path.dirname(self._health_file), exist_ok=True)
-            
-            with open(self._health_file, 'w', encoding='utf-8') as f:
-                json.dump(self._health_data, f, ensure_ascii=False, indent=2)
+            with self._write_lock:
+                # 已写入更新的快照时跳过，避免旧数据覆盖新数据
+                if generation < self._saved_generation:
+                    return True
+                
+                # 确保目录存在
+                os.makedirs(os.path.dirname(self._health_file), exist_ok=True)
+                
+                # 先写临时文件再替换，避免中途崩溃留下半个文件
+                tmp_file = self._health_file + '.tmp'
+                with open(tmp_file, 'wb') as f:
+                    f.write(payload)
+                os.replace(tmp_file, self._health_file)
+                # 记录自身写入后的mtime，避免下次加载时把刚保存的数据重新解析
+                self._mtime = os.stat(self._health_file).st_mtime_ns
+                self._saved_generation = generation
             
             logger.info(f"已保存STRM健康状态数据，包含 {len(self._health_data.get('strmFiles', {}))} 个STRM文件和 {len(self._health_data.get('videoFiles', {}))} 个视频文件")
             return True
@@ -75,9 +143,77 @@ class StrmHealthService:
             logger.error(f"保存STRM健康状态数据失败: {str(e)}")
             return False
     
+    def save_health_data(self) -> bool:
+        """保存健康状态数据到JSON文件"""
+        try:
+            # orjson一次性序列化为UTF-8字节
+            generation, payload = self._snapshot()
+        except Exception as e:
+            logger.error(f"保存STRM健康状态数据失败: {str(e)}")
+            return False
+        
+        success = self._write_snapshot(generation, payload)
+        # 只有写入的快照包含全部修改时才清除标记，失败时保持未保存状态
+        self._dirty = self._generation > self._saved_generation
+        return success
+    
+    def schedule_save(self) -> None:
+        """延迟保存，短时间内的多次调用合并为一次写文件"""
+        if not self._dirty or self._batch_depth:
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            # 没有事件循环时直接保存
+            self.save_health_data()
+            return
+        if self._save_task is None or self._save_task.done():
+            self._save_task = loop.create_task(self._save_later())
+    
+    async def _save_later(self) -> None:
+        """等待合并窗口结束后写入，写入期间数据又有修改时再保存一轮"""
+        while True:
+            await asyncio.sleep(self.SAVE_DELAY)
+            if not await self.flush() or not self._dirty:
+                break
+    
+    async def flush(self) -> bool:
+        """有未保存的修改时写入文件
+        
+        在事件循环线程中序列化快照，只把写文件放到线程中，线程不会读取正在被修改的数据
+        """
+        if not self._dirty:
+            return True
+        try:
+            generation, payload = self._snapshot()
+        except Exception as e:
+            logger.error(f"保存STRM健康状态数据失败: {str(e)}")
+            return False
+        
+        success = await asyncio.to_thread(self._write_snapshot, generation, payload)
+        self._dirty = self._generation > self._saved_generation
+        return success
+    
+    async def close(self) -> None:
+        """取消等待中的延迟保存并立即写入未保存的修改"""
+        if self._save_task and not self._save_task.done():
+            self._save_task.cancel()
+        await self.flush()
+    
+    @contextmanager
+    def batch(self):
+        """批量修改，期间不触发延迟保存，退出时统一保存一次"""
+        self._batch_depth += 1
+        try:
+            yield self
+        finally:
+            self._batch_depth -= 1
+            if not self._batch_depth and self._dirty:
+                self.save_health_data()
+    
     def get_strm_status(self, strm_path: str) -> Dict:
         """获取STRM文件的健康状态"""
-        self.load_health_data()
+        self._ensure_loaded()
         return self._health_data.get("strmFiles", {}).get(strm_path, {
             "targetPath": None,
             "lastCheckTime": 0,
@@ -87,7 +223,7 @@ class StrmHealthService:
     
     def get_video_status(self, video_path: str) -> Dict:
         """获取视频文件的健康状态"""
-        self.load_health_data()
+        self._ensure_loaded()
         return self._health_data.get("videoFiles", {}).get(video_path, {
             "hasStrm": False,
             "strmPath": None,
@@ -96,7 +232,7 @@ class StrmHealthService:
     
     def update_strm_status(self, strm_path: str, status: Dict) -> None:
         """更新STRM文件的健康状态"""
-        self.load_health_data()
+        self._ensure_loaded()
         if "strmFiles" not in self._health_data:
             self._health_data["strmFiles"] = {}
         
@@ -115,10 +251,11 @@ class StrmHealthService:
         
         # 保存回数据
         self._health_data["strmFiles"][strm_path] = current_status
+        self._mark_dirty()
     
     def update_video_status(self, video_path: str, status: Dict) -> None:
         """更新视频文件的健康状态"""
-        self.load_health_data()
+        self._ensure_loaded()
         if "videoFiles" not in self._health_data:
             self._health_data["videoFiles"] = {}
         
@@ -137,20 +274,22 @@ class StrmHealthService:
         
         # 保存回数据
         self._health_data["videoFiles"][video_path] = current_status
+        self._mark_dirty()
     
     def update_last_full_scan_time(self, scan_time: Optional[float] = None) -> None:
         """更新最后完整扫描时间"""
-        self.load_health_data()
+        self._ensure_loaded()
         self._health_data["lastFullScanTime"] = scan_time or time.time()
+        self._mark_dirty()
     
     def get_last_full_scan_time(self) -> float:
         """获取最后完整扫描时间"""
-        self.load_health_data()
+        self._ensure_loaded()
         return self._health_data.get("lastFullScanTime", 0)
     
     def get_all_invalid_strm_files(self) -> List[Dict]:
         """获取所有无效的STRM文件"""
-        self.load_health_data()
+        self._ensure_loaded()
         invalid_files = []
         
         for strm_path, status in self._health_data.get("strmFiles", {}).items():
@@ -167,7 +306,7 @@ class StrmHealthService:
     
     def get_all_missing_strm_files(self) -> List[Dict]:
         """获取所有缺失STRM的视频文件"""
-        self.load_health_data()
+        self._ensure_loaded()
         missing_files = []
         
         for video_path, status in self._health_data.get("videoFiles", {}).items():
@@ -182,13 +321,14 @@ class StrmHealthService:
     
     def remove_strm_file(self, strm_path: str) -> None:
         """从健康状态数据中移除STRM文件"""
-        self.load_health_data()
+        self._ensure_loaded()
         if "strmFiles" in self._health_data and strm_path in self._health_data["strmFiles"]:
             # 获取目标视频路径
             target_path = self._health_data["strmFiles"][strm_path].get("targetPath")
             
             # 删除STRM文件记录
             del self._health_data["strmFiles"][strm_path]
+            self._mark_dirty()
             
             # 如果有对应的视频文件记录，也更新它的状态
             if target_path and "videoFiles" in self._health_data and target_path in self._health_data["videoFiles"]:
@@ -197,7 +337,7 @@ class StrmHealthService:
     
     def add_strm_file(self, strm_path: str, video_path: str) -> None:
         """添加STRM文件和对应的视频文件记录"""
-        self.load_health_data()
+        self._ensure_loaded()
         
         # 更新STRM文件状态
         self.update_strm_status(strm_path, {
@@ -219,17 +359,22 @@ class StrmHealthService:
             "strmFiles": {},
             "videoFiles": {}
         }
+        self._mark_dirty()
         self.save_health_data()
     
     def get_stats(self) -> Dict:
         """获取健康状态统计信息"""
-        self.load_health_data()
+        self._ensure_loaded()
+        
+        strm_files = self._health_data.get("strmFiles", {})
+        video_files = self._health_data.get("videoFiles", {})
         
-        total_strm = len(self._health_data.get("strmFiles", {}))
-        invalid_strm = len([s for s in self._health_data.get("strmFiles", {}).values() if s.get("status") == "invalid"])
+        # 只计数，不为统计构建中间列表
+        total_strm = len(strm_files)
+        invalid_strm = sum(1 for s in strm_files.values() if s.get("status") == "invalid")
         
-        total_videos = len(self._health_data.get("videoFiles", {}))
-        missing_strm = len([v for v in self._health_data.get("videoFiles", {}).values() if not v.get("hasStrm")])
+        total_videos = len(video_files)
+        missing_strm = sum(1 for v in video_files.values() if not v.get("hasStrm"))
         
         return {
             "lastFullScanTime": self._health_data.get("lastFullScanTime", 0),
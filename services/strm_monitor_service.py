@@ -1,4 +1,5 @@
 import os
+import time
 from watchdog.observers import Observer
 from watchdog.events import FileSystemEventHandler
 import asyncio
@@ -7,11 +8,23 @@ from services.strm_service import AlistClient
 from urllib.parse import quote, unquote
 
 class StrmFileHandler(FileSystemEventHandler):
+    # 移动后在该时长内忽略同一路径的删除事件（秒）
+    MOVE_GUARD_TTL = 2.0
+    # 超过该数量时清理已过期的移动记录
+    MOVE_GUARD_SWEEP_SIZE = 128
+    # 文件事件的合并窗口（秒），窗口内同一路径的重复事件只处理一次
+    EVENT_BATCH_WINDOW = 0.2
+
     def __init__(self, strm_service, loop):
         self.strm_service = strm_service
         self.logger = logger
         self.loop = loop
-        self._moving_files = set()  # 用于跟踪正在移动的文件
+        self._recent_moves = {}  # 最近移动的源路径 -> 过期时间(monotonic)
+        self._pending_events = {}  # (事件类型, 路径) -> (处理协程, 参数)
+        self._drain_task = None
+        # STRM中播放地址的前缀，按当前地址配置缓存，配置变化时重新计算
+        self._prefix_key = None
+        self._url_prefixes = ()
 
     def _is_strm_path(self, path: str) -> bool:
         return path.endswith('.strm') or path.endswith('@remote(网盘).strm')
@@ -34,11 +47,26 @@ class StrmFileHandler(FileSystemEventHandler):
             return f"{base_url}/d{quote(cloud_path)}"
         return f"{base_url}/d{cloud_path}"
 
+    def _get_url_prefixes(self) -> tuple:
+        settings = self.strm_service.settings
+        key = (settings.alist_url, settings.alist_external_url)
+        if key != self._prefix_key:
+            self._prefix_key = key
+            self._url_prefixes = tuple(f"{url.rstrip('/')}/d/" for url in key if url)
+        return self._url_prefixes
+
     def _extract_cloud_path(self, content: str) -> str:
-        if "/d" not in content:
-            return ""
+        # STRM由本服务生成，内容以"<地址>/d/"开头，直接切掉前缀（保留云盘路径开头的"/"）
+        for prefix in self._get_url_prefixes():
+            if content.startswith(prefix):
+                cloud_path = content[len(prefix) - 1:]
+                break
+        else:
+            # 地址配置修改前生成的STRM，退回按"/d"切分
+            if "/d" not in content:
+                return ""
+            cloud_path = content.split("/d", 1)[1]
 
-        cloud_path = content.split("/d", 1)[1]
         if self.strm_service.settings.encode:
             cloud_path = unquote(cloud_path)
         return cloud_path
@@ -52,17 +80,19 @@ class StrmFileHandler(FileSystemEventHandler):
             if not self._is_strm_path(event.src_path):
                 return
                 
-            # 记录正在移动的文件
-            self._moving_files.add(event.src_path)
+            # 记录最近移动的文件，部分文件系统会在移动后补发源路径的删除事件
+            now = time.monotonic()
+            if len(self._recent_moves) > self.MOVE_GUARD_SWEEP_SIZE:
+                self._recent_moves = {path: expiry for path, expiry in self._recent_moves.items() if expiry > now}
+            self._recent_moves[event.src_path] = now + self.MOVE_GUARD_TTL
                 
             # 获取相对路径
             src_rel_path = os.path.relpath(event.src_path, self.strm_service.settings.output_dir)
             dest_rel_path = os.path.relpath(event.dest_path, self.strm_service.settings.output_dir)
             
-            # 在事件循环中运行异步任务
-            asyncio.run_coroutine_threadsafe(
-                self._handle_move(src_rel_path, dest_rel_path),
-                self.loop
+            # 交给事件循环合并处理
+            self.loop.call_soon_threadsafe(
+                self._queue_event, ("move", dest_rel_path), self._handle_move, src_rel_path, dest_rel_path
             )
             
         except Exception as e:
@@ -74,22 +104,51 @@ class StrmFileHandler(FileSystemEventHandler):
             if not self._is_strm_path(event.src_path):
                 return
                 
-            # 如果文件正在移动中，不处理删除事件
-            if event.src_path in self._moving_files:
+            # 如果文件刚被移动，不处理删除事件
+            expiry = self._recent_moves.get(event.src_path)
+            if expiry and time.monotonic() < expiry:
                 return
                 
             # 获取相对路径
             rel_path = os.path.relpath(event.src_path, self.strm_service.settings.output_dir)
             
-            # 在事件循环中运行异步任务
-            asyncio.run_coroutine_threadsafe(
-                self._handle_delete(rel_path),
-                self.loop
+            # 交给事件循环合并处理
+            self.loop.call_soon_threadsafe(
+                self._queue_event, ("delete", rel_path), self._handle_delete, rel_path
             )
             
         except Exception as e:
             self.logger.error(f"处理文件删除事件时出错: {str(e)}")
             
+    def _queue_event(self, key: tuple, handler, *args):
+        """在事件循环线程中登记事件，同一路径的重复事件以最后一次为准，并按其到达位置排序"""
+        # 先移除再插入，同一路径的最新事件排到队尾，保持按最后到达的顺序处理
+        self._pending_events.pop(key, None)
+        self._pending_events[key] = (handler, args)
+        if self._drain_task is None or self._drain_task.done():
+            self._drain_task = self.loop.create_task(self._drain_events())
+
+    async def _drain_events(self):
+        """等待合并窗口结束后按到达顺序逐个处理事件"""
+        await asyncio.sleep(self.EVENT_BATCH_WINDOW)
+        await self._process_pending()
+
+    async def drain(self):
+        """立即处理所有尚未处理的事件，停止监控时调用"""
+        # 让观察线程已提交到事件循环的事件先完成登记
+        await asyncio.sleep(0)
+        if self._drain_task and not self._drain_task.done():
+            await asyncio.gather(self._drain_task, return_exceptions=True)
+        await self._process_pending()
+
+    async def _process_pending(self):
+        """逐个处理队列中的事件，处理期间新到的事件也一并处理"""
+        while self._pending_events:
+            events = self._pending_events
+            self._pending_events = {}
+            for handler, args in events.values():
+                await handler(*args)
+
     async def _handle_move(self, src_path: str, dest_path: str):
         """处理文件移动
         
@@ -104,14 +163,14 @@ class StrmFileHandler(FileSystemEventHandler):
             src_strm_path = self._get_strm_abs_path(src_path)
             dest_strm_path = self._get_strm_abs_path(dest_path)
             
-            if not os.path.exists(dest_strm_path):
+            # 读取strm文件内容，获取原云盘文件路径
+            try:
+                with open(dest_strm_path, 'r', encoding='utf-8') as f:
+                    content = f.read().strip()
+            except FileNotFoundError:
                 self.logger.error(f"移动后的STRM文件不存在: {dest_strm_path}")
                 return
                 
-            # 读取strm文件内容，获取原云盘文件路径
-            with open(dest_strm_path, 'r', encoding='utf-8') as f:
-                content = f.read().strip()
-                
             # 从URL中提取云盘路径
             old_cloud_path = self._extract_cloud_path(content)
             if not old_cloud_path:
@@ -143,11 +202,8 @@ class StrmFileHandler(FileSystemEventHandler):
             )
             
             try:
-                # 移动云盘中的文件
-                if os.path.isdir(dest_strm_path):
-                    success = await alist_client.move_directory(old_cloud_path, new_cloud_path)
-                else:
-                    success = await alist_client.move_file(old_cloud_path, new_cloud_path)
+                # 移动云盘中的文件，事件只针对.strm文件，不会是目录
+                success = await alist_client.move_file(old_cloud_path, new_cloud_path)
                     
                 if success:
                     # 更新strm文件内容
@@ -159,7 +215,7 @@ class StrmFileHandler(FileSystemEventHandler):
                     service_manager = self._get_service_manager()
                     service_manager.health_service.remove_strm_file(src_strm_path)
                     service_manager.health_service.add_strm_file(dest_strm_path, new_cloud_path)
-                    service_manager.health_service.save_health_data()
+                    service_manager.health_service.schedule_save()
                         
                     self.logger.info(f"已移动文件并更新strm: {old_cloud_path} -> {new_cloud_path}")
                 else:
@@ -170,8 +226,6 @@ class StrmFileHandler(FileSystemEventHandler):
                 
         except Exception as e:
             self.logger.error(f"处理移动操作时出错: {str(e)}")
-        finally:
-            self._moving_files.discard(src_strm_path)
             
     async def _handle_delete(self, rel_path: str):
         """处理文件删除
@@ -186,11 +240,11 @@ class StrmFileHandler(FileSystemEventHandler):
             cloud_path = ""
 
             # 优先从文件读取，文件不存在时退回到健康状态缓存
-            if os.path.exists(strm_path):
+            try:
                 with open(strm_path, 'r', encoding='utf-8') as f:
                     content = f.read().strip()
                 cloud_path = self._extract_cloud_path(content)
-            else:
+            except FileNotFoundError:
                 service_manager = self._get_service_manager()
                 cloud_path = service_manager.health_service.get_strm_status(strm_path).get("targetPath") or ""
 
@@ -220,15 +274,12 @@ class StrmFileHandler(FileSystemEventHandler):
 
             # 移动文件到archive目录
             try:
-                if os.path.isdir(strm_path):
-                    success = await alist_client.move_directory(cloud_path, archive_path)
-                else:
-                    success = await alist_client.move_file(cloud_path, archive_path)
+                success = await alist_client.move_file(cloud_path, archive_path)
                     
                 if success:
                     service_manager = self._get_service_manager()
                     service_manager.health_service.remove_strm_file(strm_path)
-                    service_manager.health_service.save_health_data()
+                    service_manager.health_service.schedule_save()
                     self.logger.info(f"已将文件移动到归档目录: {cloud_path} -> {archive_path}")
                 else:
                     self.logger.error(f"移动文件到归档目录失败: {cloud_path}")
@@ -244,6 +295,7 @@ class StrmMonitorService:
         self.observer = None
         self.logger = logger
         self.loop = None
+        self.event_handler = None
         
     async def start(self):
         """启动监控服务"""
@@ -252,9 +304,9 @@ class StrmMonitorService:
             self.loop = asyncio.get_running_loop()
             
             # 创建事件处理器，传入事件循环
-            event_handler = StrmFileHandler(self.strm_service, self.loop)
+            self.event_handler = StrmFileHandler(self.strm_service, self.loop)
             self.observer = Observer()
-            self.observer.schedule(event_handler, self.strm_service.settings.output_dir, recursive=True)
+            self.observer.schedule(self.event_handler, self.strm_service.settings.output_dir, recursive=True)
             self.observer.start()
             self.logger.info(f"开始监控strm目录: {self.strm_service.settings.output_dir}")
         except Exception as e:
@@ -265,4 +317,7 @@ class StrmMonitorService:
         if self.observer:
             self.observer.stop()
             self.observer.join()
+            # 处理合并窗口中尚未处理的事件，避免停止时丢失
+            if self.event_handler:
+                await self.event_handler.drain()
             self.logger.info("已停止监控服务") 
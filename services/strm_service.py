@@ -11,6 +11,17 @@ from typing import List, Optional
 import asyncio
 import importlib
 from datetime import datetime
+from functools import lru_cache
+
+
+@lru_cache(maxsize=8)
+def _compile_skip_patterns(skip_patterns: tuple) -> tuple:
+    """编译跳过规则正则，按规则列表缓存，配置变化时自动重新编译
+    
+    Args:
+        skip_patterns: Settings.skip_patterns_list转换成的元组
+    """
+    return tuple(re.compile(pattern) for pattern in skip_patterns)
 
 class AlistClient:
     def __init__(self, base_url: str, token: str = None):
@@ -113,6 +124,9 @@ class AlistClient:
         await self.client.aclose()
 
 class StrmService:
+    # 累计多少个目录变化后落盘一次目录缓存
+    CACHE_FLUSH_THRESHOLD = 32
+
     def __init__(self):
         self.settings = Settings()
         self.alist_client = None
@@ -130,6 +144,7 @@ class StrmService:
         self._is_running = False
         self._cache_file = os.path.join(self.settings.cache_dir, 'processed_dirs.json')
         self._processed_dirs = self._load_cache()
+        self._cache_dirty = 0
 
     def refresh_settings(self):
         """重新加载运行时配置。"""
@@ -157,10 +172,19 @@ class StrmService:
         """保存缓存"""
         try:
             os.makedirs(self.settings.cache_dir, exist_ok=True)
-            with open(self._cache_file, 'w', encoding='utf-8') as f:
-                json.dump(self._processed_dirs, f, ensure_ascii=False, indent=2)
+            tmp_file = f"{self._cache_file}.tmp"
+            with open(tmp_file, 'w', encoding='utf-8') as f:
+                json.dump(self._processed_dirs, f, ensure_ascii=False, separators=(',', ':'))
+            os.replace(tmp_file, self._cache_file)
+            self._cache_dirty = 0
         except Exception as e:
             logger.error(f"保存缓存失败: {str(e)}")
+
+    def _mark_cache_dirty(self):
+        """记录目录缓存变化，累计到阈值才整体写盘，扫描结束时再补一次"""
+        self._cache_dirty += 1
+        if self._cache_dirty >= self.CACHE_FLUSH_THRESHOLD:
+            self._save_cache()
     
     def _get_dir_hash(self, path: str, files: list) -> str:
         """计算目录内容的哈希值"""
@@ -182,6 +206,7 @@ class StrmService:
         """清除缓存"""
         try:
             self._processed_dirs = {}
+            self._cache_dirty = 0
             if os.path.exists(self._cache_file):
                 os.remove(self._cache_file)
             logger.info("缓存已清除")
@@ -203,7 +228,7 @@ class StrmService:
             return True
             
         # 检查用户配置的模式
-        if any(re.search(pattern, path) for pattern in self.settings.skip_patterns_list):
+        if any(pattern.search(path) for pattern in _compile_skip_patterns(tuple(self.settings.skip_patterns_list))):
             logger.info(f"跳过匹配模式的目录: {path}")
             return True
             
@@ -222,7 +247,7 @@ class StrmService:
             return False
         
         # 检查用户配置的模式
-        if any(re.search(pattern, filename) for pattern in self.settings.skip_patterns_list):
+        if any(pattern.search(filename) for pattern in _compile_skip_patterns(tuple(self.settings.skip_patterns_list))):
             logger.info(f"跳过匹配模式的文件: {filename}")
             return True
             
@@ -295,6 +320,8 @@ class StrmService:
             await service_manager.telegram_service.send_message(error_msg)
             raise
         finally:
+            if self._cache_dirty:
+                self._save_cache()
             self._is_running = False
             self._stop_flag = False
             await self.close()
@@ -360,7 +387,7 @@ class StrmService:
             # 只有当目录中有处理过的文件时才更新缓存
             if has_processed_files:
                 self._processed_dirs[path] = dir_hash
-                self._save_cache()
+                self._mark_cache_dirty()
                     
         except Exception as e:
             logger.error(f"处理目录 {path} 时出错: {str(e)}")
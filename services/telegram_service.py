@@ -64,6 +64,13 @@ class ProcessState:
             self.stats["last_strm_scan"] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
 
 class TelegramService:
+    # Telegram单条消息长度上限为4096字符，留一些余量
+    MAX_MESSAGE_LENGTH = 4000
+    # 批量通知：攒够条数或等待超时后合并发送
+    NOTIFY_BATCH_SIZE = 50
+    NOTIFY_FLUSH_INTERVAL = 5
+    NOTIFY_SEPARATOR = "\n---\n"
+
     def __init__(self):
         self.settings = Settings()
         self.application = None
@@ -78,6 +85,9 @@ class TelegramService:
         self._is_polling = False
         self._polling_error = None
         self._enabled = None  # 添加私有变量用于存储enabled状态
+        self._pending_messages = []  # 待合并发送的通知
+        self._flush_task = None
+        self._flush_tasks = set()  # 持有发送任务的引用，防止被提前回收
 
     def refresh_settings(self):
         self.settings = Settings()
@@ -298,6 +308,13 @@ class TelegramService:
         try:
             logger.info("正在关闭Telegram服务...")
             
+            # 发送尚未发出的批量通知
+            if self._flush_task and not self._flush_task.done():
+                self._flush_task.cancel()
+            if self._flush_tasks:
+                await asyncio.gather(*self._flush_tasks, return_exceptions=True)
+            await self.flush()
+            
             # 发送停止信号
             self._stop_event.set()
             
@@ -366,8 +383,7 @@ class TelegramService:
         for attempt in range(max_attempts):
             try:
                 # 分段发送长消息，确保每段不超过4096字符
-                # Telegram限制单条消息不超过4096字符
-                max_length = 4000  # 留一些余量
+                max_length = self.MAX_MESSAGE_LENGTH
                 
                 if len(text) <= max_length:
                     # 短消息直接发送
@@ -403,6 +419,61 @@ class TelegramService:
                 logger.error(f"发送Telegram消息时出错: {e}")
                 break
                 
+    def enqueue_message(self, text):
+        """将通知加入待发送队列，与其他通知合并后批量发送
+        
+        适用于可能密集出现的逐文件通知；错误等需要即时送达的消息仍使用send_message。
+        
+        Args:
+            text: 消息文本
+        """
+        if not self.enabled or not self.application:
+            logger.debug(f"Telegram未启用或未成功启动，消息未发送: {text}")
+            return
+        
+        self._pending_messages.append(text)
+        
+        if len(self._pending_messages) >= self.NOTIFY_BATCH_SIZE:
+            self._spawn_flush(self.flush())
+        elif self._flush_task is None or self._flush_task.done():
+            self._flush_task = self._spawn_flush(self._flush_later())
+    
+    def _spawn_flush(self, coro):
+        """创建并跟踪发送任务，任务结束后自动移除"""
+        task = asyncio.create_task(coro)
+        self._flush_tasks.add(task)
+        task.add_done_callback(self._flush_tasks.discard)
+        return task
+    
+    async def _flush_later(self):
+        """等待一个合并周期后发送队列中的通知"""
+        await asyncio.sleep(self.NOTIFY_FLUSH_INTERVAL)
+        await self.flush()
+    
+    async def flush(self):
+        """立即发送队列中所有待发送的通知"""
+        if not self._pending_messages:
+            return
+        
+        messages = self._pending_messages
+        self._pending_messages = []
+        
+        # 合并为尽量少的消息，每条不超过长度上限
+        batch = []
+        length = 0
+        for text in messages:
+            added = len(text) + (len(self.NOTIFY_SEPARATOR) if batch else 0)
+            if batch and length + added > self.MAX_MESSAGE_LENGTH:
+                await self.send_message(self.NOTIFY_SEPARATOR.join(batch))
+                batch = []
+                length = 0
+                added = len(text)
+            batch.append(text)
+            length += added
+        
+        if batch:
+            await self.send_message(self.NOTIFY_SEPARATOR.join(batch))
+                
     async def _start_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """处理 /start 命令"""
         await update.message.reply_text("欢迎使用Alist STRM机器人! 输入 /help 获取帮助。")
@@ -3,6 +3,7 @@ import os
 from pathlib import Path
 
 from services.archive_service import ArchiveService
+from services.strm_service import _compile_skip_patterns
 
 
 def test_archive_target_paths_season():
@@ -27,7 +28,14 @@ def test_add_to_pending_deletion_records_move_success(tmp_path):
         "Manager",
         (),
         {
-            "telegram_service": type("TG", (), {"send_message": staticmethod(lambda *a, **k: None)})()
+            "telegram_service": type(
+                "TG",
+                (),
+                {
+                    "send_message": staticmethod(lambda *a, **k: None),
+                    "enqueue_message": staticmethod(lambda *a, **k: None),
+                },
+            )()
         },
     )()
     service._add_to_pending_deletion(
@@ -92,3 +100,17 @@ def test_delete_file_ignores_missing_children_during_directory_delete(tmp_path,
 
     assert result is True
     assert not target_dir.exists()
+
+
+def test_skip_directory_uses_shared_compiled_patterns():
+    service = ArchiveService()
+    # 基线中ArchiveService从未初始化_skip_dirs，这里显式置空
+    service._skip_dirs = []
+    service.settings.skip_folders = ""
+    service.settings.skip_patterns = r" 样本$ , \.tmp$ ,"
+    _compile_skip_patterns.cache_clear()
+
+    assert service._should_skip_directory(Path("/media/电影/样本"))
+    assert not service._should_skip_directory(Path("/media/电影/正片"))
+    # 同一份规则只编译一次，与STRM扫描共用缓存
+    assert _compile_skip_patterns.cache_info().misses == 1
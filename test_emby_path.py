@@ -16,3 +16,13 @@ def test_path_conversion():
 
     for src, expected in cases:
         assert service.convert_to_emby_path(src) == expected
+
+
+def test_path_conversion_follows_root_changes():
+    service = EmbyService()
+    service.strm_root_path = "/mnt/strm/"
+    service.emby_root_path = "/mnt/media"
+    assert service.convert_to_emby_path("/mnt/strm/a/b.strm") == "/mnt/media/a/b.strm"
+
+    service.emby_root_path = "\\mnt\\library\\"
+    assert service.convert_to_emby_path("/mnt/strm/a/b.strm") == "/mnt/library/a/b.strm"
@@ -0,0 +1,60 @@
+import httpx
+
+from services.emby_service import EmbyService
+
+
+async def test_refresh_items_deduplicates_ids(tmp_path):
+    service = EmbyService()
+    service.emby_enabled = True
+    service.last_refresh_file = tmp_path / "emby_last_refresh.json"
+
+    calls = []
+
+    async def fake_refresh(item_id):
+        calls.append(item_id)
+        if item_id == "boom":
+            raise RuntimeError("failed")
+        return item_id != "bad"
+
+    service.refresh_emby_item = fake_refresh
+
+    result = await service.refresh_items(["1", "2", "1", "bad", "boom", "2"])
+
+    assert sorted(calls) == ["1", "2", "bad", "boom"]
+    assert result["refreshed_count"] == 2
+    assert [item["id"] for item in result["refreshed_items"]] == ["1", "2"]
+    assert [item["id"] for item in result["failed_items"]] == ["bad", "boom"]
+
+
+async def test_refresh_item_does_not_retry_connect_errors(monkeypatch):
+    service = EmbyService()
+    service.emby_url = "http://emby.local"
+
+    calls = []
+
+    class FakeClient:
+        async def post(self, url, params=None, timeout=None):
+            calls.append(url)
+            raise httpx.ConnectError("refused")
+
+    monkeypatch.setattr(service, "_get_client", lambda: FakeClient())
+
+    assert await service.refresh_emby_item("1") is False
+    # 连接重试只交给transport，刷新循环不再叠加重试
+    assert len(calls) == 1
+
+
+async def test_refresh_item_logs_success_at_debug(monkeypatch, caplog):
+    service = EmbyService()
+    service.emby_url = "http://emby.local"
+
+    class FakeClient:
+        async def post(self, url, params=None, timeout=None):
+            return httpx.Response(204)
+
+    monkeypatch.setattr(service, "_get_client", lambda: FakeClient())
+
+    with caplog.at_level("INFO", logger="services.emby_service"):
+        assert await service.refresh_emby_item("1") is True
+
+    assert not [r for r in caplog.records if "成功刷新Emby项目" in r.getMessage()]
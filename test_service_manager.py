@@ -0,0 +1,34 @@
+import asyncio
+
+import services.service_manager as service_manager_module
+from services.service_manager import ServiceManager
+
+
+def test_services_are_created_on_first_access():
+    manager = ServiceManager()
+    assert manager._strm_assistant_service is None
+
+    service = manager.strm_assistant_service
+
+    assert service is manager.strm_assistant_service
+    assert manager._emby_service is None
+
+
+def test_module_aliases_resolve_through_service_manager():
+    assert service_manager_module.tg_service is service_manager_module.service_manager.telegram_service
+
+
+async def test_close_cancels_tracked_background_tasks():
+    manager = ServiceManager()
+    started = asyncio.Event()
+
+    async def forever():
+        started.set()
+        await asyncio.sleep(3600)
+
+    task = manager._spawn(forever())
+    await started.wait()
+    await manager.close()
+
+    assert task.cancelled()
+    assert not manager._bg_tasks
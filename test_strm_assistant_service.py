@@ -0,0 +1,170 @@
+import json
+
+import services.strm_assistant_service as strm_assistant_module
+from services.strm_assistant_service import StrmAssistantService
+
+
+def _write_json(path, data):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(data, ensure_ascii=False), encoding="utf-8")
+
+
+def test_load_type_metadata_prefers_all_json(tmp_path):
+    _write_json(tmp_path / "tmdb-tv" / "100" / "all.json", {"id": 100, "name": "测试剧集", "first_air_date": "2020-05-01"})
+    _write_json(tmp_path / "tmdb-tv" / "100" / "series.json", {"id": 100, "name": "旧名称"})
+    _write_json(tmp_path / "tmdb-tv" / "200" / "series.json", {"id": 200, "name": "另一部", "first_air_date": "2019-01-02T00:00:00"})
+    (tmp_path / "tmdb-tv" / "300").mkdir()
+    (tmp_path / "tmdb-tv" / "stray.json").write_text("{}")
+
+    service = StrmAssistantService()
+    assert service.set_cache_directory(str(tmp_path))
+
+    assert service.load_type_metadata("tmdb-tv") == 3
+    items = service.all_items["tmdb-tv"]
+    assert items["tmdb-tv_100"]["name"] == "测试剧集"
+    assert items["tmdb-tv_100"]["year"] == "2020"
+    assert items["tmdb-tv_200"]["year"] == "2019"
+    assert items["tmdb-tv_300"]["name"] == ""
+
+
+def test_search_items_matches_name_and_id_and_tracks_deletes(tmp_path):
+    _write_json(tmp_path / "tmdb-movies2" / "550" / "movie.json", {"id": 550, "title": "Fight Club"})
+    _write_json(tmp_path / "tmdb-movies2" / "603" / "movie.json", {"id": 603, "title": "The Matrix"})
+
+    service = StrmAssistantService()
+    service.set_cache_directory(str(tmp_path))
+    service.load_all_metadata()
+
+    assert [item["id"] for item in service.search_items("FIGHT")["tmdb-movies2"]] == [550]
+    assert [item["id"] for item in service.search_items("60")["tmdb-movies2"]] == [603]
+
+    assert service.delete_item("tmdb-movies2", "603")
+    assert service.search_items("matrix")["tmdb-movies2"] == []
+
+
+async def test_async_wrappers_run_blocking_calls(tmp_path):
+    _write_json(tmp_path / "tmdb-tv" / "100" / "series.json", {"id": 100, "name": "测试剧集"})
+    _write_json(tmp_path / "tmdb-tv" / "100" / "season-1.json", {"name": "第一季"})
+
+    service = StrmAssistantService()
+    service.set_cache_directory(str(tmp_path))
+
+    assert (await service.load_all_metadata_async())["tmdb-tv"] == 1
+    assert [s["season_number"] for s in await service.get_seasons_async("tmdb-tv", "100")] == [1]
+    assert await service.delete_item_async("tmdb-tv", "100")
+    assert service.all_items["tmdb-tv"] == {}
+
+
+def test_delete_season_removes_season_and_its_episodes_only(tmp_path):
+    item_dir = tmp_path / "tmdb-tv" / "100"
+    for name in ("season-1.json", "season-1-episode-1.json", "season-1-episode-2.json",
+                 "season-10-episode-1.json", "season-2.json", "series.json"):
+        _write_json(item_dir / name, {})
+
+    service = StrmAssistantService()
+    service.set_cache_directory(str(tmp_path))
+
+    assert service.delete_season("tmdb-tv", "100", 1)
+    assert sorted(p.name for p in item_dir.iterdir()) == ["season-10-episode-1.json", "season-2.json", "series.json"]
+
+
+def test_reload_reuses_unchanged_entries_and_picks_up_changes(tmp_path, monkeypatch):
+    movie_json = tmp_path / "tmdb-movies2" / "550" / "movie.json"
+    _write_json(movie_json, {"id": 550, "title": "Fight Club"})
+    _write_json(tmp_path / "tmdb-movies2" / "603" / "movie.json", {"id": 603, "title": "The Matrix"})
+
+    service = StrmAssistantService()
+    service.set_cache_directory(str(tmp_path))
+    service.load_all_metadata()
+
+    parsed = []
+    real_loads = strm_assistant_module.orjson.loads
+    monkeypatch.setattr(strm_assistant_module.orjson, "loads", lambda raw: parsed.append(raw) or real_loads(raw))
+
+    _write_json(movie_json, {"id": 550, "title": "Fight Club (1999)"})
+    service.load_all_metadata()
+
+    assert len(parsed) == 1
+    assert service.all_items["tmdb-movies2"]["tmdb-movies2_550"]["name"] == "Fight Club (1999)"
+    assert service.all_items["tmdb-movies2"]["tmdb-movies2_603"]["name"] == "The Matrix"
+
+
+def test_get_seasons_and_episodes_parse_file_names(tmp_path):
+    item_dir = tmp_path / "tmdb-tv" / "100"
+    _write_json(item_dir / "season-2.json", {"name": "第二季"})
+    _write_json(item_dir / "season-10.json", {})
+    _write_json(item_dir / "season-1-episode-2.json", {"name": "第二集"})
+    _write_json(item_dir / "season-1-episode-10.json", {})
+    _write_json(item_dir / "season-10-episode-1.json", {})
+    _write_json(item_dir / "series.json", {})
+
+    service = StrmAssistantService()
+    service.set_cache_directory(str(tmp_path))
+
+    assert [s["season_number"] for s in service.get_seasons("tmdb-tv", "100")] == [2, 10]
+    episodes = service.get_episodes("tmdb-tv", "100", 1)
+    assert [e["episode_number"] for e in episodes] == [2, 10]
+    assert episodes[0]["name"] == "第二集"
+
+
+def test_get_episodes_reflects_deleted_episodes(tmp_path):
+    item_dir = tmp_path / "tmdb-tv" / "100"
+    for episode in (1, 2):
+        _write_json(item_dir / f"season-1-episode-{episode}.json", {})
+    _write_json(item_dir / "season-2-episode-1.json", {})
+
+    service = StrmAssistantService()
+    service.set_cache_directory(str(tmp_path))
+
+    assert [e["episode_number"] for e in service.get_episodes("tmdb-tv", "100", 1)] == [1, 2]
+    assert service.delete_episode("tmdb-tv", "100", 1, 2)
+    assert [e["episode_number"] for e in service.get_episodes("tmdb-tv", "100", 1)] == [1]
+    assert service.delete_season("tmdb-tv", "100", 2)
+    assert service.get_episodes("tmdb-tv", "100", 2) == []
+
+
+def test_search_items_pages_results(tmp_path):
+    for item_id in range(1, 6):
+        _write_json(tmp_path / "tmdb-movies2" / str(item_id) / "movie.json", {"id": item_id, "title": f"Movie {item_id}"})
+
+    service = StrmAssistantService()
+    service.set_cache_directory(str(tmp_path))
+    service.load_all_metadata()
+
+    everything = service.search_items("")["tmdb-movies2"]
+    assert service.search_items("", limit=2, offset=1)["tmdb-movies2"] == everything[1:3]
+    assert service.search_items("movie", limit=2, offset=3)["tmdb-movies2"] == everything[3:5]
+    assert len(service.search_items("movie")["tmdb-movies2"]) == 5
+
+
+def test_reload_keeps_serving_old_items_until_swap(tmp_path, monkeypatch):
+    _write_json(tmp_path / "tmdb-movies2" / "550" / "movie.json", {"id": 550, "title": "Fight Club"})
+    _write_json(tmp_path / "tmdb-tv" / "100" / "series.json", {"id": 100, "name": "Show"})
+
+    service = StrmAssistantService()
+    service.set_cache_directory(str(tmp_path))
+    service.load_all_metadata()
+
+    seen = []
+    real_load = service.load_type_metadata
+
+    def observing_load(data_type):
+        # 加载剧集时，电影仍可被搜索到
+        seen.append(len(service.search_items("fight")["tmdb-movies2"]))
+        return real_load(data_type)
+
+    monkeypatch.setattr(service, "load_type_metadata", observing_load)
+    service.load_all_metadata()
+
+    assert seen == [1, 1, 1]
+
+
+def test_format_date_normalizes_and_rejects_invalid_dates():
+    service = StrmAssistantService()
+
+    assert service.format_date("2023-01-05") == "2023-01-05"
+    assert service.format_date("2023-01-05T12:30:00") == "2023-01-05"
+    assert service.format_date("2023-1-5") == "2023-01-05"
+    assert service.format_date("2023-13-45") == "2023-13-45"
+    assert service.format_date("unknown") == "unknown"
+    assert service.format_date("") == ""
@@ -0,0 +1,138 @@
+import asyncio
+import json
+import os
+import threading
+
+from services.strm_health_service import StrmHealthService
+
+
+def _make_service(tmp_path):
+    service = StrmHealthService()
+    service._health_file = str(tmp_path / "data" / "strm_health.json")
+    return service
+
+
+def test_load_health_data_reloads_only_when_file_changes(tmp_path):
+    service = _make_service(tmp_path)
+    service.add_strm_file("/strm/a.strm", "/video/a.mkv")
+    assert service.save_health_data()
+
+    other = _make_service(tmp_path)
+    assert other.get_strm_status("/strm/a.strm")["targetPath"] == "/video/a.mkv"
+
+    # 外部更新文件后，显式加载会读取新内容
+    data = json.loads(open(service._health_file, encoding="utf-8").read())
+    data["lastFullScanTime"] = 123
+    with open(service._health_file, "w", encoding="utf-8") as f:
+        json.dump(data, f)
+    stat = os.stat(service._health_file)
+    os.utime(service._health_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+
+    assert other.load_health_data()
+    assert other.get_last_full_scan_time() == 123
+
+    # 文件未变化时保留内存中的数据
+    other.update_last_full_scan_time(456)
+    assert other.load_health_data()
+    assert other.get_last_full_scan_time() == 456
+
+
+def test_batch_writes_once_on_exit(tmp_path, monkeypatch):
+    service = _make_service(tmp_path)
+    saves = []
+    real_save = service.save_health_data
+    monkeypatch.setattr(service, "save_health_data", lambda: saves.append(1) or real_save())
+
+    with service.batch():
+        service.add_strm_file("/strm/a.strm", "/video/a.mkv")
+        service.add_strm_file("/strm/b.strm", "/video/b.mkv")
+        service.schedule_save()
+        assert saves == []
+
+    assert saves == [1]
+    assert not service._dirty
+
+
+async def test_schedule_save_coalesces_updates(tmp_path, monkeypatch):
+    service = _make_service(tmp_path)
+    service.SAVE_DELAY = 0
+    saves = []
+    real_write = service._write_snapshot
+    monkeypatch.setattr(service, "_write_snapshot", lambda *args: saves.append(1) or real_write(*args))
+
+    for name in ("a", "b", "c"):
+        service.add_strm_file(f"/strm/{name}.strm", f"/video/{name}.mkv")
+        service.schedule_save()
+    await service._save_task
+
+    assert saves == [1]
+    assert _make_service(tmp_path).get_stats()["totalStrmFiles"] == 3
+
+
+async def test_changes_made_while_writing_are_saved_later(tmp_path, monkeypatch):
+    service = _make_service(tmp_path)
+    service.add_strm_file("/strm/a.strm", "/video/a.mkv")
+
+    release = threading.Event()
+    real_write = service._write_snapshot
+
+    def slow_write(*args):
+        release.wait(5)
+        return real_write(*args)
+
+    monkeypatch.setattr(service, "_write_snapshot", slow_write)
+    flushing = asyncio.create_task(service.flush())
+    await asyncio.sleep(0.05)
+
+    # 写入进行中时又有修改
+    service.add_strm_file("/strm/b.strm", "/video/b.mkv")
+    service.schedule_save()
+    release.set()
+    await flushing
+
+    assert service._dirty
+    await service.close()
+
+    assert not service._dirty
+    on_disk = json.loads(open(service._health_file, encoding="utf-8").read())
+    assert sorted(on_disk["strmFiles"]) == ["/strm/a.strm", "/strm/b.strm"]
+
+
+def test_load_health_data_keeps_unsaved_changes(tmp_path):
+    service = _make_service(tmp_path)
+    service.add_strm_file("/strm/a.strm", "/video/a.mkv")
+    assert service.save_health_data()
+
+    service.add_strm_file("/strm/b.strm", "/video/b.mkv")
+    with open(service._health_file, "w", encoding="utf-8") as f:
+        json.dump({"lastFullScanTime": 0, "strmFiles": {}, "videoFiles": {}}, f)
+    stat = os.stat(service._health_file)
+    os.utime(service._health_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+
+    assert service.load_health_data()
+    assert service.get_stats()["totalStrmFiles"] == 2
+    assert service._dirty
+
+
+async def test_delete_route_saves_once_for_all_files(tmp_path, monkeypatch):
+    import routes.health as health_routes
+
+    service = _make_service(tmp_path)
+    paths = []
+    for name in ("a", "b", "c"):
+        strm_file = tmp_path / f"{name}.strm"
+        strm_file.write_text(f"/video/{name}.mkv")
+        service.add_strm_file(str(strm_file), f"/video/{name}.mkv")
+        paths.append(str(strm_file))
+    assert service.save_health_data()
+
+    saves = []
+    real_save = service.save_health_data
+    monkeypatch.setattr(service, "save_health_data", lambda: saves.append(1) or real_save())
+    monkeypatch.setattr(health_routes.service_manager, "_health_service", service)
+
+    result = await health_routes.delete_strm_files(paths)
+
+    assert len(result["deleted"]) == 3
+    assert saves == [1]
+    assert service.get_stats()["totalStrmFiles"] == 0
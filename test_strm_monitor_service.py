@@ -21,7 +21,7 @@ class FakeHealthService:
     def add_strm_file(self, path, target):
         self.status[path] = {"targetPath": target}
 
-    def save_health_data(self):
+    def schedule_save(self):
         self.saved += 1
 
 
@@ -105,3 +105,61 @@ async def test_handle_delete_uses_health_cache_when_file_is_missing(monkeypatch,
     assert strm_abs in health.removed
     assert health.saved == 1
     assert FakeClient.instances[-1].closed is True
+
+
+async def test_extract_cloud_path_strips_configured_prefix(tmp_path):
+    handler = build_handler(tmp_path)
+    handler.strm_service.settings.alist_url = "http://dav.local/"
+
+    assert handler._extract_cloud_path("http://dav.local/d/library/%E7%94%B5%E5%BD%B1.mkv") == "/library/电影.mkv"
+    # 配置变更前生成的地址仍可解析
+    assert handler._extract_cloud_path("http://old.host/d/library/a.mkv") == "/library/a.mkv"
+
+
+async def test_delete_event_right_after_move_is_ignored(monkeypatch, tmp_path):
+    handler = build_handler(tmp_path)
+    handler.EVENT_BATCH_WINDOW = 0
+    handled = []
+
+    async def fake_move(src, dest):
+        handled.append(("move", src, dest))
+
+    async def fake_delete(path):
+        handled.append(("delete", path))
+
+    monkeypatch.setattr(handler, "_handle_move", fake_move)
+    monkeypatch.setattr(handler, "_handle_delete", fake_delete)
+    output_dir = handler.strm_service.settings.output_dir
+    src = f"{output_dir}/电影/a.strm"
+    moved = SimpleNamespace(src_path=src, dest_path=f"{output_dir}/电影/b.strm")
+
+    handler.on_moved(moved)
+    handler.on_moved(moved)
+    handler.on_deleted(SimpleNamespace(src_path=src))
+    await asyncio.sleep(0)
+    await handler._drain_task
+    assert handled == [("move", "电影/a.strm", "电影/b.strm")]
+
+    handler._recent_moves[src] = 0
+    handler.on_deleted(SimpleNamespace(src_path=src))
+    await asyncio.sleep(0)
+    await handler._drain_task
+    assert handled[-1] == ("delete", "电影/a.strm")
+
+
+async def test_queue_orders_by_latest_arrival_and_drain_flushes(monkeypatch, tmp_path):
+    handler = build_handler(tmp_path)
+    handler.EVENT_BATCH_WINDOW = 3600
+    handled = []
+
+    async def fake_delete(path):
+        handled.append(path)
+
+    handler._queue_event(("delete", "a"), fake_delete, "a")
+    handler._queue_event(("delete", "b"), fake_delete, "b")
+    handler._queue_event(("delete", "a"), fake_delete, "a")
+    handler._drain_task.cancel()
+
+    await handler.drain()
+
+    assert handled == ["b", "a"]
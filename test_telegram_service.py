@@ -0,0 +1,39 @@
+from services.telegram_service import TelegramService
+
+
+async def test_flush_merges_queued_messages_within_length_limit():
+    service = TelegramService()
+    service.MAX_MESSAGE_LENGTH = 20
+    sent = []
+
+    async def fake_send(text):
+        sent.append(text)
+
+    service.send_message = fake_send
+    service._pending_messages = ["aaaa", "bbbb", "cccccccccccc", "dd"]
+
+    await service.flush()
+
+    assert sent == ["aaaa\n---\nbbbb", "cccccccccccc\n---\ndd"]
+    assert service._pending_messages == []
+
+
+async def test_enqueue_tracks_flush_tasks_until_close():
+    service = TelegramService()
+    service.NOTIFY_BATCH_SIZE = 2
+    service._enabled = True
+    service.application = object()
+    sent = []
+
+    async def fake_send(text):
+        sent.append(text)
+
+    service.send_message = fake_send
+    service.enqueue_message("a")
+    service.enqueue_message("b")
+
+    assert len(service._flush_tasks) == 2
+    await service.close()
+
+    assert sent == ["a\n---\nb"]
+    assert not service._flush_tasks